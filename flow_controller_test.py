@@ -0,0 +1,44 @@
+import networkx as nx
+
+from src.utils import Counter
+from src.network import FlowController
+
+
+def ring_snapshot(with_facility=True):
+    """Four satellites in a ring, the facility attached to Sat1_3."""
+    graph = nx.Graph()
+    nx.add_cycle(graph, ['Sat1_1', 'Sat1_2', 'Sat1_3', 'Sat1_4'])
+    if with_facility:
+        graph.add_edge('Sat1_3', 'Facility1')
+    return graph
+
+
+def run_flow(graph_list, backend):
+    Counter().reset_counter()
+    flow = {'start_node': 'Sat1_1', 'target_node': 'Facility1', 'graph_index': 0,
+            'duration': len(graph_list), 'bandwidth': 4}
+    controller = FlowController([flow], graph_list, backend=backend, use_route_cache=False)
+    controller.control_flow()
+    return controller.counter
+
+
+def test_blocked_flow_releases_its_reservations():
+    for backend in ('nx', 'csr'):
+        # routable in the first snapshot, the facility is out of view in the second
+        graph_list = [ring_snapshot(), ring_snapshot(with_facility=False)]
+        counter = run_flow(graph_list, backend)
+
+        assert counter.total_flows == 1
+        assert counter.blocked_flows == 1
+        assert all(data['bandwidth'] == 10 for _, _, data in graph_list[0].edges(data=True))
+
+
+def test_routed_flow_keeps_its_reservations():
+    for backend in ('nx', 'csr'):
+        graph_list = [ring_snapshot(), ring_snapshot()]
+        counter = run_flow(graph_list, backend)
+
+        assert counter.blocked_flows == 0
+        for graph in graph_list:
+            assert graph['Sat1_1']['Sat1_2']['bandwidth'] == 6
+            assert graph['Sat1_3']['Facility1']['bandwidth'] == 6
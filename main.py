@@ -5,7 +5,6 @@
 # @File    : main.py
 
 
-from src.stk import STKManager
 # from plot.satellite_visualizer import SatelliteVisualizer
 from src.utils import *
 import pandas as pd
@@ -14,7 +13,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 from src.utils.logger import Logger
 from src.utils.tools import get_graph_list
-from src.network import FlowGenerator, FlowController
+from src.utils.snapshot_store import SnapshotStore, STORE_DIR_NAME
+from src.network import FlowGenerator, FlowController, Workload
 
 logger = Logger().get_logger()
 
@@ -26,21 +26,30 @@ def main():
     project_root = Path(__file__).resolve().parent
     graphs_dir = project_root / 'graphs'
     
-    if graphs_dir.exists() and any(graphs_dir.glob('graph*.json')):
+    if graphs_dir.exists() and (any(graphs_dir.glob('graph*.json')) or SnapshotStore.exists(graphs_dir / STORE_DIR_NAME)):
         # If graph files exist, generate graph list
         logger.info("Graph files found, generating graph list...")
         # graph_list = get_graph_list(graphs_dir)
     else:
         # Create graphs directory if it doesn't exist
         graphs_dir.mkdir(parents=True, exist_ok=True)
-        logger.info("No graph files found, running STK simulation first...")
-        # Initialize STK Manager
-        manager = STKManager()
-        manager.launch_stk()
-        manager.attach_to_application()
-        # manager.load_scenario('D:/STKScenario/200/200sat.sc',
-        #                       "1 Aug 2020 16:00:00", "1 Aug 2020 16:30:00")
+        if simulator == 'stk':
+            logger.info("No graph files found, running STK simulation first...")
+            from src.stk import STKManager
+            # Initialize STK Manager
+            manager = STKManager()
+            manager.launch_stk()
+            manager.attach_to_application()
+            # manager.load_scenario('D:/STKScenario/200/200sat.sc',
+            #                       "1 Aug 2020 16:00:00", "1 Aug 2020 16:30:00")
+        else:
+            logger.info("No graph files found, running analytic simulation first...")
+            from src.engine import AnalyticManager
+            manager = AnalyticManager()
         manager.create_scenario("1 Aug 2020 16:00:00", "1 Aug 2020 17:00:00")
+        if simulator == 'stk':
+            # resume from previously fetched access data after a crash
+            manager.enable_access_cache(constraint=True)
         manager.create_constellation("DeltaConstellation")
         manager.create_facilities()
         manager.get_sat_access(constraint=True)
@@ -51,8 +60,13 @@ def main():
 
     
     # # # Initialize flow generator with the number of flows
-    # flow_generator = FlowGenerator(graph_list)
-    # flows = flow_generator.generate_flows_for_each_graph()
+    # flow_generator = FlowGenerator(graph_list, seed=flow_seed)
+    # # generate the workload once, later runs replay the same flows
+    # workload_file = project_root / 'data' / 'workload.npz'
+    # if workload_file.exists():
+    #     flows = Workload.load(workload_file)
+    # else:
+    #     flows = flow_generator.generate_workload(workload_file)
 
     # # process flows
     # flow_controller = FlowController(flows, graph_list)
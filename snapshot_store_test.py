@@ -0,0 +1,81 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.utils.snapshot_store import SnapshotStore
+
+
+def snapshot(n, **edge_attrs):
+    graph = nx.path_graph([f"Sat1_{i}" for i in range(n)])
+    for name, value in edge_attrs.items():
+        nx.set_edge_attributes(graph, value, name)
+    graph.graph['time'] = f"t{n}"
+    return graph
+
+
+def test_save_replaces_store_and_drops_stale_attributes(tmp_path):
+    store_dir = tmp_path / 'snapshots.store'
+    SnapshotStore.save(store_dir, [snapshot(3, range=1.0, weight=2.0)])
+    SnapshotStore.save(store_dir, [snapshot(4, range=5.0)])
+
+    assert not (store_dir / 'edge_weight.npy').exists()
+    graph = SnapshotStore(store_dir).get_graph(0)
+    assert all(data == {'range': 5.0} for _, _, data in graph.edges(data=True))
+
+
+def test_failed_save_keeps_previous_store(tmp_path, monkeypatch):
+    store_dir = tmp_path / 'snapshots.store'
+    SnapshotStore.save(store_dir, [snapshot(3, range=1.0)])
+
+    calls = []
+    save = np.save
+
+    def failing_save(*args, **kwargs):
+        # some arrays of the new store are written before the failure
+        calls.append(args[0])
+        if len(calls) > 3:
+            raise OSError("disk full")
+        return save(*args, **kwargs)
+    monkeypatch.setattr(np, 'save', failing_save)
+    with pytest.raises(OSError):
+        SnapshotStore.save(store_dir, [snapshot(4, range=5.0)])
+    monkeypatch.undo()
+
+    store = SnapshotStore(store_dir)
+    assert store.times == ['t3']
+    graph = store.get_graph(0)
+    assert (graph.number_of_nodes(), graph.number_of_edges()) == (3, 2)
+
+
+def test_convert_reads_json_over_existing_store(tmp_path):
+    from src.utils.snapshot_io import save_snapshots
+
+    SnapshotStore.save(tmp_path / 'snapshots.store', [snapshot(3, range=1.0)])
+    save_snapshots([snapshot(5, range=2.0), snapshot(6, range=2.0)], tmp_path)
+
+    store = SnapshotStore.convert_graph_dir(tmp_path)
+    assert store.times == ['t5', 't6']
+
+
+def test_snapshot_format_selects_what_is_read(tmp_path, monkeypatch):
+    from src.utils import tools, snapshot_store
+    from src.utils.snapshot_io import save_snapshots
+
+    SnapshotStore.save(tmp_path / 'snapshots.store', [snapshot(3, range=1.0)])
+    save_snapshots([snapshot(5, range=2.0)], tmp_path)
+
+    monkeypatch.setattr(snapshot_store, 'snapshot_format', 'json')
+    assert tools.get_graph_list(tmp_path)[0].graph['time'] == 't5'
+    monkeypatch.setattr(snapshot_store, 'snapshot_format', 'store')
+    assert tools.get_graph_list(tmp_path)[0].graph['time'] == 't3'
+
+
+def test_json_save_removes_stale_store(tmp_path, monkeypatch):
+    from src.utils import tools
+
+    SnapshotStore.save(tmp_path / 'snapshots.store', [snapshot(3, range=1.0)])
+    monkeypatch.setattr(tools, 'snapshot_format', 'json')
+    tools.save_graph_list([snapshot(5, range=2.0)], tmp_path)
+
+    assert not SnapshotStore.exists(tmp_path / 'snapshots.store')
+    assert tools.get_graph_list(tmp_path)[0].graph['time'] == 't5'
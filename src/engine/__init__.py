@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:05
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : __init__.py
+
+from .propagator import WalkerPropagator
+from .isl_builder import ISLBuilder
+from .visibility import VisibilityEngine
+from .analytic_manager import AnalyticManager
+
+__all__ = ['WalkerPropagator', 'ISLBuilder', 'VisibilityEngine', 'AnalyticManager']
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:40
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : analytic_manager.py
+
+import numpy as np
+import networkx as nx
+from pathlib import Path
+
+from src.engine.propagator import WalkerPropagator, ecef_to_geodetic
+from src.engine.isl_builder import ISLBuilder
+from src.engine.visibility import VisibilityEngine
+from src.utils.sim_config import *
+from src.utils.tools import generate_time_series, set_node_coordinates, save_graph_list
+from src.utils.time_align import forward_fill
+from src.utils import Logger
+
+logger = Logger().get_logger()
+
+
+class AnalyticManager:
+    """Offline replacement for STKManager.
+
+    Exposes the same pipeline (create_scenario -> create_constellation -> create_facilities
+    -> get_sat_access -> get_fac_access -> get_sat_lla -> save_graph_data) but propagates the
+    whole constellation with NumPy instead of driving STK over COM.
+    """
+
+    def __init__(self, min_elevation=0.0):
+        self.project_root = Path(__file__).resolve().parents[2]
+        self.data_directory = self.project_root / 'data'
+        self.time_series = None
+        self.graph_list = []
+        self.propagator = None
+        self.sat_names = []
+        self.sat_ecef = None
+        self.sat_lat = None  # (satellite x time) latitude, filled by get_sat_lla
+        self.sat_lon = None  # (satellite x time) longitude, filled by get_sat_lla
+        self.facilities = []
+        self.visibility = None
+        self.min_elevation = min_elevation
+
+    def create_scenario(self, start_time, end_time):
+        self.time_series = generate_time_series(start_time, end_time, time_step)
+        # Initialize empty graph list for each time step
+        self.graph_list = []
+        for t in self.time_series:
+            graph = nx.Graph()
+            graph.graph['time'] = t.isoformat()
+            self.graph_list.append(graph)
+
+    def create_constellation(self, constellation_name):
+        """Propagate every satellite over the whole time grid in one pass."""
+        logger.info(f"Propagating {constellation_name}: T={T}, P={P}, F={F}, inc={inc}, a={height} km")
+        self.propagator = WalkerPropagator(T, P, F, inc, height)
+        self.sat_names = self.propagator.sat_names
+        self.sat_ecef = self.propagator.propagate(self.time_series)
+        for graph in self.graph_list:
+            graph.add_nodes_from(self.sat_names)
+
+    def create_facilities(self):
+        self.facilities = [name for name, _, _, _ in facility_data]
+        lats, lons, alts = np.array([fac[1:] for fac in facility_data]).T
+        self.visibility = VisibilityEngine(lats, lons, alts, self.min_elevation)
+        for graph in self.graph_list:
+            for name, latitude, longitude, altitude in facility_data:
+                if not graph.has_node(name):
+                    graph.add_node(name, lat=latitude, lon=longitude, alt=altitude)
+
+    def get_sat_access(self, constraint=False, grazing_angle=isl_grazing_angle):
+        """Add +Grid links to every snapshot.
+
+        With constraint=True the link also needs grazing_angle (deg) of clearance above the
+        earth limb, the analytic counterpart of the STK angle constraint in STKManager.
+        """
+        builder = ISLBuilder(num_orbit_planes, num_sat_per_plane, F,
+                             grazing_angle=grazing_angle if constraint else None)
+        ranges, visible = builder.compute(self.sat_ecef)
+        # carry the last valid range through outages, like STKManager.compute_sat_access
+        blocked = ~visible
+        ranges = np.where(blocked, forward_fill(ranges, blocked, 500), ranges)
+
+        links = builder.link_names(self.sat_names)
+        for t, graph in enumerate(self.graph_list):
+            graph.add_edges_from(
+                (u, v, {'range': r, 'sun_outage': o})
+                for (u, v), r, o in zip(links, ranges[t].tolist(), blocked[t].tolist())
+            )
+        logger.info(f"Added {len(links)} inter-satellite links to {len(self.graph_list)} snapshots")
+
+    def get_fac_access(self):
+        pairs = self.visibility.visible_pairs(self.sat_ecef)
+        link_count = 0
+        for graph, (f_idx, s_idx, ranges) in zip(self.graph_list, pairs):
+            graph.add_edges_from(
+                (self.sat_names[s], self.facilities[f], {'range': r})
+                for f, s, r in zip(f_idx.tolist(), s_idx.tolist(), ranges.tolist())
+            )
+            link_count += len(f_idx)
+        logger.info(f"Added {link_count} satellite-facility links")
+
+    def get_sat_lla(self):
+        lat, lon, _ = ecef_to_geodetic(self.sat_ecef)
+        self.sat_lat, self.sat_lon = lat.T, lon.T
+        set_node_coordinates(self.graph_list, self.sat_names, self.sat_lat, self.sat_lon)
+
+    def save_graph_data(self):
+        graphs_dir = self.project_root / 'graphs'
+        graphs_dir.mkdir(parents=True, exist_ok=True)
+
+        save_graph_list(self.graph_list, graphs_dir, indent=2)
+        logger.info(f"Saved graph data to {graphs_dir}")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:20
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : isl_builder.py
+
+import numpy as np
+
+from src.engine.propagator import EARTH_RADIUS
+
+
+class ISLBuilder:
+    """Batched +Grid inter-satellite links.
+
+    Every satellite links to the next satellite in its plane and to the same slot in the
+    adjacent plane; the last plane wraps to plane 1 shifted by the phasing factor
+    (Sat1_{(sat_num + F) % (T/P)} in STKManager.get_sat_access). Satellite indices follow
+    WalkerPropagator: index = plane * sats_per_plane + slot.
+    """
+
+    def __init__(self, num_planes, sats_per_plane, phasing, grazing_angle=None):
+        self.num_planes = int(num_planes)
+        self.sats_per_plane = int(sats_per_plane)
+        self.phasing = int(phasing)
+        # minimum angle (deg) between the link and the earth limb seen from either end
+        self.grazing_angle = grazing_angle
+        self.src, self.dst = self.neighbour_indices()
+
+    def neighbour_indices(self):
+        """Source/destination satellite indices of all ~2T links, inter-plane links first."""
+        plane = np.repeat(np.arange(self.num_planes), self.sats_per_plane)
+        slot = np.tile(np.arange(self.sats_per_plane), self.num_planes)
+        src = plane * self.sats_per_plane + slot
+
+        # adjacent plane, the last plane wraps to plane 1 shifted by the phasing factor
+        inter_plane = (plane + 1) % self.num_planes
+        inter_slot = np.where(plane == self.num_planes - 1, (slot + self.phasing) % self.sats_per_plane, slot)
+        inter_dst = inter_plane * self.sats_per_plane + inter_slot
+
+        # next satellite in the same plane
+        intra_dst = plane * self.sats_per_plane + (slot + 1) % self.sats_per_plane
+
+        src = np.concatenate([src, src])
+        dst = np.concatenate([inter_dst, intra_dst])
+
+        # drop degenerate links (a single plane, or one satellite per plane)
+        keep = src != dst
+        return src[keep], dst[keep]
+
+    def link_names(self, sat_names):
+        return [(sat_names[u], sat_names[v]) for u, v in zip(self.src.tolist(), self.dst.tolist())]
+
+    def compute(self, positions, chunk_size=256):
+        """Ranges and visibility for every link at every timestamp.
+
+        Args:
+            positions: satellite positions (km) with shape (time, satellite, 3)
+            chunk_size: number of timestamps evaluated per batch, bounds peak memory
+
+        Returns:
+            ranges: float array (time, link) in km
+            visible: bool array (time, link), False when the earth (plus the grazing
+                margin, if set) blocks the line of sight
+        """
+        n_time = positions.shape[0]
+        ranges = np.empty((n_time, len(self.src)))
+        visible = np.empty((n_time, len(self.src)), dtype=bool)
+        for start in range(0, n_time, chunk_size):
+            stop = min(start + chunk_size, n_time)
+            ranges[start:stop], visible[start:stop] = self._compute_chunk(positions[start:stop])
+        return ranges, visible
+
+    def _compute_chunk(self, positions):
+        p1 = positions[:, self.src]
+        p2 = positions[:, self.dst]
+        diff = p2 - p1
+        ranges = np.linalg.norm(diff, axis=-1)
+
+        # closest approach of the segment p1 -> p2 to the earth centre
+        s = np.clip(-np.einsum('tlk,tlk->tl', p1, diff) / np.maximum(ranges ** 2, 1e-9), 0.0, 1.0)
+        closest = np.linalg.norm(p1 + s[..., None] * diff, axis=-1)
+        visible = closest >= EARTH_RADIUS
+
+        if self.grazing_angle is not None:
+            min_angle = np.radians(self.grazing_angle)
+            visible &= self._limb_angle(p1, diff, ranges) >= min_angle
+            visible &= self._limb_angle(p2, -diff, ranges) >= min_angle
+        return ranges, visible
+
+    @staticmethod
+    def _limb_angle(origin, direction, length):
+        """Angle (rad) of the link above the earth limb as seen from origin."""
+        radius = np.linalg.norm(origin, axis=-1)
+        # angle between nadir and the link direction
+        cos_nadir = -np.einsum('tlk,tlk->tl', origin, direction) / np.maximum(radius * length, 1e-9)
+        nadir_angle = np.arccos(np.clip(cos_nadir, -1.0, 1.0))
+        # angular radius of the earth disc
+        limb = np.arcsin(np.clip(EARTH_RADIUS / radius, -1.0, 1.0))
+        return nadir_angle - limb
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:12
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : propagator.py
+
+import numpy as np
+import pandas as pd
+
+from src.utils.time_align import to_epoch_ns
+
+# earth constants (WGS84)
+MU_EARTH = 398600.4418  # km^3/s^2
+EARTH_RADIUS = 6378.137  # km
+EARTH_FLATTENING = 1 / 298.257223563
+EARTH_ECC2 = EARTH_FLATTENING * (2 - EARTH_FLATTENING)
+EARTH_ROTATION_RATE = 7.2921150e-5  # rad/s
+
+
+def gmst(time_series):
+    """Greenwich mean sidereal angle (rad) for each timestamp."""
+    # days since J2000.0 (2000-01-01 12:00 UT)
+    days = (to_epoch_ns(time_series) - pd.Timestamp('2000-01-01T12:00:00').value) / 86400e9
+    theta = 280.46061837 + 360.98564736629 * days
+    return np.radians(np.mod(theta, 360.0))
+
+
+def geodetic_to_ecef(lat, lon, alt):
+    """Convert geodetic coordinates (deg, deg, km) to ECEF (km), shape (..., 3)."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    alt = np.asarray(alt, dtype=float)
+    n = EARTH_RADIUS / np.sqrt(1 - EARTH_ECC2 * np.sin(lat) ** 2)
+    x = (n + alt) * np.cos(lat) * np.cos(lon)
+    y = (n + alt) * np.cos(lat) * np.sin(lon)
+    z = (n * (1 - EARTH_ECC2) + alt) * np.sin(lat)
+    return np.stack([x, y, z], axis=-1)
+
+
+def ecef_to_geodetic(ecef, iterations=3):
+    """Convert ECEF (km), shape (..., 3), to geodetic lat/lon (deg) and altitude (km)."""
+    x, y, z = ecef[..., 0], ecef[..., 1], ecef[..., 2]
+    lon = np.arctan2(y, x)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - EARTH_ECC2))
+    for _ in range(iterations):
+        n = EARTH_RADIUS / np.sqrt(1 - EARTH_ECC2 * np.sin(lat) ** 2)
+        alt = p / np.cos(lat) - n
+        lat = np.arctan2(z, p * (1 - EARTH_ECC2 * n / (n + alt)))
+    n = EARTH_RADIUS / np.sqrt(1 - EARTH_ECC2 * np.sin(lat) ** 2)
+    alt = p / np.cos(lat) - n
+    return np.degrees(lat), np.degrees(lon), alt
+
+
+class WalkerPropagator:
+    """Two-body circular propagation of a Walker-delta constellation.
+
+    Satellites are laid out exactly like STKManager.create_constellation:
+    plane p (1-based) has RAAN 360 * (p - 1) / P and its true anomalies are
+    shifted by p * F * 360 / T, satellites are named Sat{plane}_{sat}.
+    """
+
+    def __init__(self, total_sats, num_planes, phasing, inclination, semi_major_axis):
+        self.total_sats = int(total_sats)
+        self.num_planes = int(num_planes)
+        self.sats_per_plane = self.total_sats // self.num_planes
+        self.phasing = phasing
+        self.inclination = np.radians(inclination)
+        self.semi_major_axis = semi_major_axis
+        self.mean_motion = np.sqrt(MU_EARTH / semi_major_axis ** 3)  # rad/s
+
+        plane_idx = np.repeat(np.arange(self.num_planes), self.sats_per_plane)
+        slot_idx = np.tile(np.arange(self.sats_per_plane), self.num_planes)
+        self.plane_idx = plane_idx
+        self.slot_idx = slot_idx
+        self.raan = np.radians(360.0 * plane_idx / self.num_planes)
+        anomaly = (360.0 * slot_idx / self.sats_per_plane
+                   + (plane_idx + 1) * (360.0 / self.total_sats) * self.phasing) % 360
+        self.initial_anomaly = np.radians(anomaly)
+        self.sat_names = [f"Sat{p + 1}_{s + 1}" for p, s in zip(plane_idx, slot_idx)]
+
+    def propagate_eci(self, time_series):
+        """Inertial positions (km) with shape (time, satellite, 3)."""
+        epochs = to_epoch_ns(time_series)
+        elapsed = (epochs - epochs[0]) / 1e9
+        # argument of latitude for every (time, satellite)
+        u = self.initial_anomaly[None, :] + self.mean_motion * elapsed[:, None]
+        cos_u, sin_u = np.cos(u), np.sin(u)
+        cos_raan, sin_raan = np.cos(self.raan), np.sin(self.raan)
+        cos_inc, sin_inc = np.cos(self.inclination), np.sin(self.inclination)
+
+        positions = np.empty(u.shape + (3,))
+        positions[..., 0] = cos_raan * cos_u - sin_raan * sin_u * cos_inc
+        positions[..., 1] = sin_raan * cos_u + cos_raan * sin_u * cos_inc
+        positions[..., 2] = sin_u * sin_inc
+        positions *= self.semi_major_axis
+        return positions
+
+    def propagate(self, time_series):
+        """Earth-fixed positions (km) with shape (time, satellite, 3)."""
+        eci = self.propagate_eci(time_series)
+        theta = gmst(time_series)[:, None]
+        cos_t, sin_t = np.cos(theta), np.sin(theta)
+        ecef = np.empty_like(eci)
+        ecef[..., 0] = cos_t * eci[..., 0] + sin_t * eci[..., 1]
+        ecef[..., 1] = -sin_t * eci[..., 0] + cos_t * eci[..., 1]
+        ecef[..., 2] = eci[..., 2]
+        return ecef
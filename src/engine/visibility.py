@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 13:05
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : visibility.py
+
+import numpy as np
+
+from src.engine.propagator import geodetic_to_ecef
+
+
+class VisibilityEngine:
+    """Batched ground-to-satellite elevation, range and visibility.
+
+    Facilities are fixed in the earth frame, so their ECEF positions and local "up" vectors
+    are computed once; every (time, facility, satellite) triple is then evaluated with array
+    operations on the satellite ECEF positions.
+    """
+
+    def __init__(self, lats, lons, alts, min_elevation=0.0):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self.min_elevation = min_elevation
+        self.fac_ecef = geodetic_to_ecef(lats, lons, alts)
+        # ellipsoid normal at each facility
+        lat_r, lon_r = np.radians(lats), np.radians(lons)
+        self.up = np.stack([np.cos(lat_r) * np.cos(lon_r),
+                            np.cos(lat_r) * np.sin(lon_r),
+                            np.sin(lat_r)], axis=-1)
+
+    def _project(self, sat_ecef):
+        """Range (km) and height above the local horizon plane (km), shape (time, facility, satellite).
+
+        Both come from matrix products against the facility table instead of materializing
+        the (time, facility, satellite, 3) difference vectors.
+        """
+        sat_dot_fac = np.matmul(sat_ecef, self.fac_ecef.T).transpose(0, 2, 1)
+        sat_norm2 = np.einsum('tsk,tsk->ts', sat_ecef, sat_ecef)[:, None, :]
+        fac_norm2 = np.einsum('fk,fk->f', self.fac_ecef, self.fac_ecef)[None, :, None]
+        ranges = np.sqrt(np.maximum(sat_norm2 + fac_norm2 - 2 * sat_dot_fac, 0.0))
+
+        fac_up = np.einsum('fk,fk->f', self.fac_ecef, self.up)[None, :, None]
+        height = np.matmul(sat_ecef, self.up.T).transpose(0, 2, 1) - fac_up
+        return ranges, height
+
+    def compute(self, sat_ecef):
+        """Elevation (deg) and range (km) tensors with shape (time, facility, satellite)."""
+        ranges, height = self._project(sat_ecef)
+        elevation = np.degrees(np.arcsin(np.clip(height / ranges, -1.0, 1.0)))
+        return elevation, ranges
+
+    def visible_pairs(self, sat_ecef, chunk_size=64):
+        """Visible (facility, satellite) pairs for every snapshot.
+
+        Args:
+            sat_ecef: satellite positions (km) with shape (time, satellite, 3)
+            chunk_size: number of timestamps evaluated per batch, bounds peak memory
+
+        Returns:
+            list with one (fac_idx, sat_idx, range) tuple of arrays per snapshot
+        """
+        sin_min = np.sin(np.radians(self.min_elevation))
+        pairs = []
+        for start in range(0, sat_ecef.shape[0], chunk_size):
+            chunk = sat_ecef[start:start + chunk_size]
+            ranges, height = self._project(chunk)
+            # compare sines instead of angles to skip the arcsin
+            visible = height >= sin_min * ranges
+
+            t_idx, f_idx, s_idx = np.nonzero(visible)
+            vis_ranges = ranges[visible]
+            # np.nonzero is time-major, so each snapshot is a contiguous slice
+            bounds = np.searchsorted(t_idx, np.arange(chunk.shape[0] + 1))
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                pairs.append((f_idx[lo:hi], s_idx[lo:hi], vis_ranges[lo:hi]))
+        return pairs
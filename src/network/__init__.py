@@ -6,4 +6,5 @@
 
 from .flow_generator import FlowGenerator
 from .flow_controller import FlowController
+from .workload import Workload
 
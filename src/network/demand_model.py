@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 21:50
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : demand_model.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.utils import Logger, haversine_distance
+
+logger = Logger().get_logger()
+
+
+class DemandModel:
+    """Cities weighted by their number of internet users, for sampling flow endpoints.
+
+    The merged and cleaned table is cached next to the source CSVs as an NPZ file and
+    rebuilt only when one of the sources changes. Samples are drawn from the cumulative
+    weights with a binary search, so each costs O(log n).
+    """
+
+    def __init__(self, population_dir=None, rng=None):
+        project_root = Path(__file__).resolve().parents[2]
+        self.population_dir = Path(population_dir) if population_dir else project_root / 'data' / 'population_data'
+        self.city_file = self.population_dir / 'worldcities.csv'
+        self.internet_file = self.population_dir / 'world_internet_user_origin.csv'
+        self.cache_file = self.population_dir / 'demand_model.npz'
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        data = self._load()
+        self.latitudes = data['latitudes']
+        self.longitudes = data['longitudes']
+        self.weights = data['weights']
+        self.cdf = data['cdf']
+
+    def __len__(self):
+        return len(self.weights)
+
+    def _signature(self):
+        return json.dumps([[path.name, path.stat().st_mtime_ns, path.stat().st_size]
+                           for path in (self.city_file, self.internet_file)])
+
+    def _load(self):
+        signature = self._signature()
+        if self.cache_file.exists():
+            try:
+                with np.load(self.cache_file, allow_pickle=False) as data:
+                    if str(data['signature']) == signature:
+                        return {key: data[key] for key in data.files}
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Discarding unreadable demand cache {self.cache_file}: {e}")
+
+        data = self._build()
+        data['signature'] = np.array(signature)
+        tmp_path = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **data)
+        os.replace(tmp_path, self.cache_file)
+        logger.info(f"Cached demand model with {len(data['weights'])} cities to {self.cache_file}")
+        return data
+
+    def _build(self):
+        # Load city data with geographic information and internet usage data
+        city_data = pd.read_csv(self.city_file, usecols=['country', 'population', 'lat', 'lng'])
+        internet_data = pd.read_csv(self.internet_file, encoding='ISO-8859-1', usecols=['Country', '% of Population'])
+
+        # Merge city population data with internet usage data
+        merged_data = city_data.merge(internet_data, left_on='country', right_on='Country', how='left')
+
+        # Drop rows with NaN values in population or internet usage percentage
+        cleaned_data = merged_data.dropna(subset=['population', '% of Population'])
+
+        # number of internet users of every city is its sampling weight
+        weights = (cleaned_data['population'] * (cleaned_data['% of Population'] / 100)).to_numpy(dtype=float)
+        return {
+            'latitudes': cleaned_data['lat'].to_numpy(dtype=float),
+            'longitudes': cleaned_data['lng'].to_numpy(dtype=float),
+            'weights': weights,
+            'cdf': np.cumsum(weights),
+        }
+
+    def sample_indices(self, n):
+        """Indices of n cities drawn with replacement, proportional to their weights."""
+        indices = np.searchsorted(self.cdf, self.rng.random(n) * self.cdf[-1], side='right')
+        return np.minimum(indices, len(self.cdf) - 1)
+
+    def sample_points(self, n):
+        """(longitudes, latitudes) of n weighted samples."""
+        indices = self.sample_indices(n)
+        return self.longitudes[indices], self.latitudes[indices]
+
+    def sample_pairs(self, n, min_distance=10000, max_attempts=100):
+        """Draw n weighted (start, end) pairs whose end lies at least min_distance km from the start.
+
+        Returns:
+            start_lons, start_lats, end_lons, end_lats
+        """
+        start = self.sample_indices(n)
+        end = self.sample_ends(start, min_distance, max_attempts)
+        return self.longitudes[start], self.latitudes[start], self.longitudes[end], self.latitudes[end]
+
+    def sample_ends(self, start, min_distance=10000, max_attempts=100):
+        """Weighted end city for every start city index, at least min_distance km away.
+
+        Candidate ends are drawn for all starts at once and only the rejected rows are drawn
+        again. A row still rejected after max_attempts keeps its last candidate.
+        """
+        end = self.sample_indices(len(start))
+        pending = np.arange(len(start))
+        for _ in range(max_attempts - 1):
+            distances = haversine_distance(self.latitudes[start[pending]], self.longitudes[start[pending]],
+                                           self.latitudes[end[pending]], self.longitudes[end[pending]])
+            pending = pending[distances < min_distance]
+            if not len(pending):
+                break
+            end[pending] = self.sample_indices(len(pending))
+        return end
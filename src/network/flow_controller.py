@@ -8,6 +8,7 @@ import pandas as pd
 import math
 import re
 import random
+import weakref
 import networkx as nx
 import json
 import numpy as np
@@ -15,34 +16,72 @@ import numpy as np
 from pathlib import Path
 from itertools import islice
 
-from src.utils import Counter, Logger
+from src.utils import Counter, Logger, SnapshotSequence
+from src.utils.sim_config import *
+from src.network.routing_engine import RoutingGraph
+from src.network.route_cache import RouteCache
+from src.network.gateway_router import GatewayRouter
 
 logger = Logger().get_logger()
 
 class FlowController:
-    def __init__(self, flows, graph_list):
+    def __init__(self, flows, graph_list, backend=routing_backend, protection=protection_mode,
+                 use_route_cache=route_cache, primary=primary_routing):
         self.counter = Counter()
         self.flows = flows
         self.graph_list = graph_list
-        BANDWIDTH = 10  # 10 Gbps
-        for graph in self.graph_list:
-            for edge in graph.edges():
-                graph[edge[0]][edge[1]]['bandwidth'] = BANDWIDTH  # 单位：Gbps
+        # 'csr' routes on compiled RoutingGraphs, 'nx' on the NetworkX snapshots
+        self.backend = backend
+        # 'sequential' finds the backup after the primary, 'disjoint' finds both at once
+        self.protection = protection
+        # routes reused across flows and snapshots while they stay usable, None disables it
+        self.route_cache = RouteCache() if use_route_cache else None
+        # 'k_shortest' searches every primary path, 'gateway_tree' walks a per-gateway tree
+        self.primary = primary
+        self._facilities = weakref.WeakKeyDictionary()  # snapshot -> facility nodes
+        self._routing_graphs = weakref.WeakKeyDictionary()  # snapshot -> RoutingGraph
+        self._gateway_routers = weakref.WeakKeyDictionary()  # snapshot -> {bandwidth: GatewayRouter}
+        if isinstance(graph_list, SnapshotSequence):
+            # snapshots are loaded lazily, set bandwidth as each one is loaded and keep the
+            # residual bandwidth of evicted snapshots for when they are loaded again
+            graph_list.add_load_hook(self._init_bandwidth)
+            graph_list.track_edge_attribute('bandwidth')
+        else:
+            for graph in self.graph_list:
+                self._init_bandwidth(graph)
 
         # Get the current file path and project root directory
         self.current_file = Path(__file__).resolve()
         self.project_root = self.current_file.parents[2]
         
+    @staticmethod
+    def _init_bandwidth(graph):
+        BANDWIDTH = 10  # 10 Gbps
+        for edge in graph.edges():
+            graph[edge[0]][edge[1]]['bandwidth'] = BANDWIDTH  # 单位：Gbps
+
     def control_flow(self):
         logger.info("Starting flow control...")
-        self.counter.total_flows = len(self.flows)
+        # flows may be a list, a Workload or a lazy stream, so count them as they arrive
+        self.counter.total_flows = 0
 
         # Process flows
-        for i in range(len(self.flows)):
-            flow = self.flows[i]
+        for i, flow in enumerate(self._iter_flows()):
+            self.counter.total_flows += 1
             self.process_flow(i, flow)
             logger.debug(f"Flow {i} completed.")
 
+        if self.route_cache is not None:
+            logger.info(self.route_cache.summary())
+
+    def _iter_flows(self):
+        # flatten per-snapshot batches from FlowGenerator.iter_flows(per_snapshot=True)
+        for item in self.flows:
+            if isinstance(item, list):
+                yield from item
+            else:
+                yield item
+
 
     # process flows one by one
     def process_flow(self, idx, flow):
@@ -54,13 +93,19 @@ class FlowController:
         # ensure end_index is not greater than the length of the graph_list
         end_index = min(end_index, len(self.graph_list))
 
-        for graph in [self.graph_list[i] for i in range(start_index, end_index)]:
-            primary_path = self.find_path(graph, flow)
-            
-            # Only try to find backup path if primary path exists
-            backup_path = None
-            if primary_path is not None:
-                backup_path = self.find_path(graph, flow, path_type='backup', existing_path=primary_path)
+        # (snapshot, path) reservations of this flow, released again if it is blocked
+        allocated = []
+        for graph in self.graph_list[start_index:end_index]:
+            if self.protection == 'disjoint':
+                # primary and backup found together as the cheapest disjoint pair
+                primary_path, backup_path = self.find_disjoint_paths(graph, flow)
+            else:
+                primary_path = self.find_path(graph, flow)
+
+                # Only try to find backup path if primary path exists
+                backup_path = None
+                if primary_path is not None:
+                    backup_path = self.find_path(graph, flow, path_type='backup', existing_path=primary_path)
 
             graph_time = graph.graph.get('time', 'Unknown')
             
@@ -68,6 +113,7 @@ class FlowController:
             if primary_path is not None and backup_path is not None:
                 self.allocate_resource(graph, flow, primary_path)
                 self.allocate_resource(graph, flow, backup_path)
+                allocated.extend([(graph, primary_path), (graph, backup_path)])
                 logger.info(f"Successfully allocated both paths for flow {idx} at time {graph_time}")
                 logger.debug(f"Primary path: {primary_path}")
                 logger.debug(f"Backup path: {backup_path}")
@@ -77,25 +123,114 @@ class FlowController:
                 else:
                     logger.warning(f"Failed to find backup path for flow {idx} at time {graph_time}")
 
+                # a flow missing its paths in any snapshot is blocked and holds no bandwidth
+                for allocated_graph, path in allocated:
+                    self.release_resource(allocated_graph, flow, path)
+                self.counter.increment_blocked_flows()
+                break
+
+    def find_disjoint_paths(self, graph, flow):
+        """Primary and backup path of a flow as one disjoint pair, or (None, None).
+
+        Links without enough residual bandwidth are hidden before the search, so both paths
+        of a returned pair can be allocated.
+        """
+        key = (flow['start_node'], flow['target_node'], 'disjoint')
+        if self.route_cache is not None:
+            hidden_nodes = self._get_facilities(graph) - {flow['target_node']}
+            pair = self.route_cache.lookup(key, lambda routes: all(
+                self._route_usable(graph, flow, route, hidden_nodes) for route in routes))
+            if pair is not None:
+                return pair
+
+        routing_graph = self._get_routing_graph(graph)
+        source = routing_graph.node_index.get(flow['start_node'])
+        target = routing_graph.node_index.get(flow['target_node'])
+        if source is None or target is None:
+            return None, None
+
+        node_mask = routing_graph.node_mask(self._get_facilities(graph) - {flow['target_node']})
+        edge_mask = routing_graph.bandwidth < flow.get('bandwidth', 0)
+        pair = routing_graph.find_disjoint_pair(source, target, weight=disjoint_weight, disjoint=disjoint_type,
+                                                node_mask=node_mask, edge_mask=edge_mask)
+        if pair is None:
+            return None, None
+        pair = routing_graph.path_names(pair[0]), routing_graph.path_names(pair[1])
+        if self.route_cache is not None:
+            self.route_cache.store(key, pair)
+        return pair
+
+    def _get_facilities(self, graph):
+        # facility nodes of a snapshot, collected once per snapshot
+        facilities = self._facilities.get(graph)
+        if facilities is None:
+            facilities = frozenset(node for node in graph.nodes() if node.startswith('Facility'))
+            self._facilities[graph] = facilities
+        return facilities
+
+    def _get_routing_graph(self, graph):
+        # compiled on first use, bandwidth is kept in sync by allocate_resource
+        routing_graph = self._routing_graphs.get(graph)
+        if routing_graph is None:
+            routing_graph = RoutingGraph.from_graph(graph)
+            self._routing_graphs[graph] = routing_graph
+        return routing_graph
 
     def find_path(self, graph, flow, path_type='primary', existing_path=None):
-        # remove the facilities who is not the target node
-        def remove_other_facilities(_graph):
-            pattern = r'^Facility'
-            facilities_to_remove = [node for node in _graph.nodes() if
-                                    re.match(pattern, node) and node != flow['target_node']]
-            _graph.remove_nodes_from(facilities_to_remove)
+        if self.route_cache is None:
+            return self._search_path(graph, flow, path_type, existing_path)
+
+        # the route a search with the same rules returned for an earlier flow or snapshot
+        hidden_nodes = self._get_facilities(graph) - {flow['target_node']}
+        excluded_edges = set()
+        if path_type == 'primary':
+            key = (flow['start_node'], flow['target_node'], path_type)
+        else:
+            key = (existing_path[0], existing_path[-2], path_type)
+            hidden_nodes = hidden_nodes | {flow['target_node']}
+            for i in range(1, len(existing_path) - 1):
+                excluded_edges.add((existing_path[i - 1], existing_path[i]))
+                excluded_edges.add((existing_path[i], existing_path[i - 1]))
+
+        path = self.route_cache.lookup(
+            key, lambda route: self._route_usable(graph, flow, route, hidden_nodes, excluded_edges))
+        if path is None:
+            path = self._search_path(graph, flow, path_type, existing_path)
+            if path is not None:
+                self.route_cache.store(key, path)
+        return path
+
+    @staticmethod
+    def _route_usable(graph, flow, route, hidden_nodes, excluded_edges=()):
+        """Whether every hop of a cached route exists in graph with enough residual bandwidth."""
+        required_bandwidth = flow.get('bandwidth', 0)
+        for node in route:
+            if node in hidden_nodes:
+                return False
+        for current_node, next_node in zip(route[:-1], route[1:]):
+            if (current_node, next_node) in excluded_edges:
+                return False
+            edge = graph.get_edge_data(current_node, next_node)
+            if edge is None or edge.get('bandwidth', 0) < required_bandwidth:
+                return False
+        return True
+
+    def _search_path(self, graph, flow, path_type='primary', existing_path=None):
+        if path_type == 'primary' and self.primary == 'gateway_tree':
+            path = self._find_path_tree(graph, flow)
+            if path is not None:
+                return path
+        if self.backend == 'csr':
+            return self._find_path_csr(graph, flow, path_type, existing_path)
 
         def k_shortest_paths(_graph, _source, _target, k=4, weight=None):
             return list(
                 islice(nx.shortest_simple_paths(_graph, _source, _target, weight=weight), k)
             )
         try:
-            # Create a copy of the graph for path calculation
-            graph_copy = graph.copy()
-
-            # Remove other facilities from the graph
-            remove_other_facilities(graph_copy)
+            # hide the facilities who is not the target node
+            excluded_nodes = self._get_facilities(graph) - {flow['target_node']}
+            excluded_edges = set()
 
             if path_type == 'primary':
                 source = flow['start_node']
@@ -103,44 +238,122 @@ class FlowController:
 
             # if the pp exist, find backup path
             else:
-                # Remove edges explicitly between intermediate nodes
-                # remove the edge from the first satellite to feedback satellite
+                # Hide edges explicitly between intermediate nodes
+                # hide the edge from the first satellite to feedback satellite
                 for i in range(1, len(existing_path) - 1):
-                    start_node = existing_path[i - 1]
-                    end_node = existing_path[i]
-                    if graph_copy.has_edge(start_node, end_node):
-                        graph_copy.remove_edge(start_node, end_node)
-                        # print(f"Removed edge: {start_node} -> {end_node}")
+                    excluded_edges.add((existing_path[i - 1], existing_path[i]))
+                    excluded_edges.add((existing_path[i], existing_path[i - 1]))
 
-                # Remove target facility from the graph_copy
-                target_facility = flow['target_node']
-                if graph_copy.has_node(target_facility):
-                    graph_copy.remove_node(target_facility)
+                # Hide target facility from the graph
+                excluded_nodes = excluded_nodes | {flow['target_node']}
 
                 source = existing_path[0]
                 target = existing_path[-2]
 
-            paths = k_shortest_paths(graph_copy, source, target)
+            # restricted read-only view of the snapshot, the topology is never copied
+            graph_view = nx.subgraph_view(
+                graph,
+                filter_node=lambda node: node not in excluded_nodes,
+                filter_edge=lambda u, v: (u, v) not in excluded_edges,
+            )
+
+            paths = k_shortest_paths(graph_view, source, target)
             for path in paths:
-                if self.check_resource(flow, path):
+                if self.check_resource(flow, path, graph):
                     logger.debug(f"found {path_type} path: {path}")
                     return path
             return None
         except (nx.NetworkXNoPath, nx.NodeNotFound):
             return None
+
+    def _find_path_csr(self, graph, flow, path_type='primary', existing_path=None):
+        """find_path on the compiled snapshot, same rules as the NetworkX search."""
+        routing_graph = self._get_routing_graph(graph)
+        # hide the facilities who is not the target node
+        hidden_nodes = self._get_facilities(graph) - {flow['target_node']}
+        edge_mask = None
+
+        if path_type == 'primary':
+            source = flow['start_node']
+            target = flow['target_node']
+        else:
+            # hide the edges of the primary path up to the last satellite, and the target facility
+            edge_mask = np.zeros(routing_graph.num_edges, dtype=bool)
+            for i in range(1, len(existing_path) - 1):
+                edge = routing_graph.edge_index.get((routing_graph.node_index.get(existing_path[i - 1]),
+                                                     routing_graph.node_index.get(existing_path[i])))
+                if edge is not None:
+                    edge_mask[edge] = True
+            hidden_nodes = hidden_nodes | {flow['target_node']}
+
+            source = existing_path[0]
+            target = existing_path[-2]
+
+        if source not in routing_graph.node_index or target not in routing_graph.node_index:
+            return None
+
+        paths = routing_graph.k_shortest_paths(
+            routing_graph.node_index[source], routing_graph.node_index[target], k=4,
+            node_mask=routing_graph.node_mask(hidden_nodes), edge_mask=edge_mask)
+        for path in paths:
+            if self._check_resource_csr(routing_graph, flow, path):
+                path = routing_graph.path_names(path)
+                logger.debug(f"found {path_type} path: {path}")
+                return path
+        return None
+
+    def _get_gateway_router(self, graph, flow):
+        # one set of trees per bandwidth class, so every flow walks trees over exactly the
+        # links it can use
+        routers = self._gateway_routers.setdefault(graph, {})
+        bandwidth = flow.get('bandwidth', 0)
+        router = routers.get(bandwidth)
+        if router is None:
+            router = GatewayRouter(self._get_routing_graph(graph), self._get_facilities(graph),
+                                   min_bandwidth=bandwidth)
+            routers[bandwidth] = router
+        return router
+
+    def _find_path_tree(self, graph, flow):
+        """Primary path read off the shortest-path tree of the flow's gateway.
+
+        The trees of the flow's bandwidth class only hold links with enough residual bandwidth.
+        Only a path as short as the snapshot's unloaded shortest path is taken; otherwise None
+        is returned and the caller falls back to the k-shortest search and its candidate limit.
+        """
+        router = self._get_gateway_router(graph, flow)
+        routing_graph = router.routing_graph
+        source = routing_graph.node_index.get(flow['start_node'])
+        target = routing_graph.node_index.get(flow['target_node'])
+        if source is None or target is None:
+            return None
+        path = router.path(source, target, max_detour=0)
+        if path is None or not self._check_resource_csr(routing_graph, flow, path):
+            return None
+        path = routing_graph.path_names(path)
+        logger.debug(f"found primary path: {path}")
+        return path
+
+    @staticmethod
+    def _check_resource_csr(routing_graph, flow, path):
+        edges = routing_graph.path_edges(path)
+        return edges is not None and bool((routing_graph.bandwidth[edges] >= flow.get('bandwidth', 0)).all())
      
-    def check_resource(self, flow, path):
+    def check_resource(self, flow, path, graph=None):
         """
         Check if there's enough bandwidth along the path for the flow
         
         Args:
             flow: Flow dictionary containing bandwidth requirement
             path: List of nodes representing the path
+            graph: snapshot the path was found in, defaults to the flow's first snapshot
             
         Returns:
             bool: True if enough bandwidth available, False otherwise
         """
         required_bandwidth = flow.get('bandwidth', 0)  # Get required bandwidth from flow
+        if graph is None:
+            graph = self.graph_list[flow['graph_index']]
         
         # Check bandwidth availability for each edge in the path
         for i in range(len(path) - 1):
@@ -148,10 +361,10 @@ class FlowController:
             next_node = path[i + 1]
             
             # Get current available bandwidth on the edge
-            if not self.graph_list[flow['graph_index']].has_edge(current_node, next_node):
+            if not graph.has_edge(current_node, next_node):
                 return False
             
-            edge = self.graph_list[flow['graph_index']][current_node][next_node]
+            edge = graph[current_node][next_node]
             available_bandwidth = edge.get('bandwidth', 0)
             
             # Check if enough bandwidth is available
@@ -182,5 +395,35 @@ class FlowController:
             else:
                 raise ValueError(f"Edge {current_node} -> {next_node} does not exist in graph")
 
+        self._sync_bandwidth(graph, path, -required_bandwidth)
+
+    def release_resource(self, graph, flow, path):
+        """
+        Return the bandwidth allocate_resource reserved along the path for the flow
+
+        Args:
+            graph: NetworkX graph the path was allocated on
+            flow: Flow dictionary containing bandwidth requirement
+            path: List of nodes representing the path
+        """
+        required_bandwidth = flow.get('bandwidth', 0)
+        for current_node, next_node in zip(path[:-1], path[1:]):
+            graph[current_node][next_node]['bandwidth'] += required_bandwidth
+
+        self._sync_bandwidth(graph, path, required_bandwidth)
+
+    def _sync_bandwidth(self, graph, path, delta):
+        # a lazily loaded snapshot must not be reloaded at full capacity
+        if isinstance(self.graph_list, SnapshotSequence):
+            self.graph_list.mark_dirty(graph)
+
+        # keep the compiled snapshot and its gateway trees in sync
+        routing_graph = self._routing_graphs.get(graph)
+        if routing_graph is not None:
+            edges = routing_graph.path_edges(routing_graph.path_ids(path))
+            routing_graph.bandwidth[edges] += delta
+            for router in self._gateway_routers.get(graph, {}).values():
+                router.update(edges)
+
 
 
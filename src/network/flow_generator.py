@@ -4,9 +4,9 @@
 # @Email   : daniel_fys@163.com
 # @File    : flow_generator.py
 
-import random
 import networkx as nx
 import json
+import numpy as np
 import pandas as pd
 import math
 from datetime import timedelta
@@ -22,19 +22,31 @@ import pycountry
 from src.utils import Counter, get_time_list
 from src.utils.sim_config import *
 from src.utils import Logger
+from src.network.spatial_index import SpatialIndex
+from src.network.demand_model import DemandModel
+from src.network.workload import Workload
+from src.network.traffic_model import TrafficModel
+from src.network.routing_engine import RoutingGraph
 
 logger = Logger().get_logger()
 
 class FlowGenerator:
-    def __init__(self,  graph_list=None):
+    def __init__(self,  graph_list=None, seed=flow_seed, mode=traffic_mode):
         # Initialize flow generator with the number of flows
         self.graph_list = graph_list
+        # every random draw goes through this generator, so a fixed seed reproduces the workload
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         self.current_file = Path(__file__).resolve()
         self.project_root = self.current_file.parents[2]
         self.time_series = get_time_list()
         self.counter = Counter()
         self.flows = []
         self.coordinates = []
+        self.spatial_indices = {}  # (graph_index, 'Sat' / 'Fac') -> SpatialIndex
+        self.demand_model = None
+        self.mode = mode
+        self.traffic_model = None
 
         # get configuration
         # self.minimum_bandwidth = minimum_bandwidth
@@ -51,6 +63,15 @@ class FlowGenerator:
         #     self.project_root / 'data' / 'ne_10m_admin_0_countries' / 'ne_10m_admin_0_countries.shp')
 
     def generate_flows_for_each_graph(self):
+        self.flows.extend(self.iter_flows())
+        return self.flows
+
+    def iter_flows(self, per_snapshot=False):
+        """Yield the flows of every snapshot lazily in time order.
+
+        Args:
+            per_snapshot: yield one list of flows per snapshot instead of single flows
+        """
         # # the number of flows is Poisson distributed
         # k = 3  # k 越大，方差越小
 
@@ -59,20 +80,32 @@ class FlowGenerator:
 
         # generate flows for each graph
         for index in range(len(self.graph_list)):
-            graph = self.graph_list[index]
-
-            # generate node lists for each graph
-            satellites, facilities = self._generate_node_lists(graph)
-
-            # generate random countries and random points
-            start_points, end_points= self._select_points(avg_flow_num)
+            if self.mode == 'poisson':
+                start_lons, start_lats, end_lons, end_lats, durations = self._get_traffic_model().sample_snapshot(index)
+                durations = durations.tolist()
+            else:
+                # generate random countries and random points
+                start_points, end_points= self._select_points(avg_flow_num)
+                if start_points:
+                    # points are (lon, lat)
+                    start_lons, start_lats = zip(*start_points)
+                    end_lons, end_lats = zip(*end_points)
+                # use the average duration
+                durations = [3] * len(start_points)
+            if not durations:
+                if per_snapshot:
+                    yield []
+                continue
 
-            for start_point, end_point in zip(start_points, end_points):
-                # find the nearest satellite to the start point
-                nearest_sat_name, _ = self._find_nearest_satellite(start_point[0], start_point[1], index)
+            # look up all nearest nodes of this snapshot at once
+            nearest_sats, _ = self._find_nearest_satellites(start_lats, start_lons, index)
+            nearest_facs, _ = self._find_nearest_facilities(end_lats, end_lons, index)
+            # snapshots are visited once, keep only the indices of the current one
+            self.spatial_indices.pop((index, 'Sat'), None)
+            self.spatial_indices.pop((index, 'Fac'), None)
 
-                # find the nearest facility to the end point
-                nearest_fac_name, _ = self._find_nearest_facility(end_point[0], end_point[1], index)
+            batch = []
+            for nearest_sat_name, nearest_fac_name, duration in zip(nearest_sats.tolist(), nearest_facs.tolist(), durations):
                 # logger.debug(f"Nearest satellite: {nearest_sat_name}, Nearest facility: {nearest_fac_name}")
 
                 # # count the usage of the satellite
@@ -87,9 +120,6 @@ class FlowGenerator:
                 # # ensure the bandwidth is between the minimum and maximum bandwidth
                 # bandwidth = max(min(bandwidth, self.maximum_bandwidth), self.minimum_bandwidth)
 
-                # use the average duration
-                duration = 3
-
                 # flow information
                 flow = {
                     "graph_index": index,
@@ -100,9 +130,20 @@ class FlowGenerator:
                     # "bandwidth": bandwidth,
                     "duration": duration,
                 }
-                self.flows.append(flow)
-        return self.flows
-    
+                batch.append(flow)
+
+            if per_snapshot:
+                yield batch
+            else:
+                yield from batch
+
+    def generate_workload(self, path=None):
+        """Generate the flows of every snapshot as a Workload, saved to path if given."""
+        workload = Workload.from_flows(self.iter_flows(), seed=self.seed,
+                                       avg_flow_num=avg_flow_num, num_snapshots=len(self.graph_list))
+        if path is not None:
+            workload.save(path)
+        return workload
 
     def generate_flows_for_plotting(self, num_flows):
         # 用于记录每个卫星节点作为起始节点的次数
@@ -134,6 +175,7 @@ class FlowGenerator:
 
         # 为每个图生成节点列表
         satellites, facilities = self._generate_node_lists(graph)
+        routing_graph = RoutingGraph.from_graph(graph)
 
         # 生成随机国家和随机点
         selected_points = self._select_countries_and_points(num_flows)
@@ -152,23 +194,21 @@ class FlowGenerator:
                 start_node = nearest_satellite_id
             else:
                 # 否则，随机选择一个卫星节点
-                start_node = random.choice(satellites)
+                start_node = satellites[self.rng.integers(len(satellites))]
 
             # 随机选择一个地面站作为目标节点
-            target_node = random.choice(facilities)
-
-            # 创建图的副本并移除其他地面站
-            graph_copy = graph.copy()
-            other_facilities = [node for node in facilities if node != target_node]
-            graph_copy.remove_nodes_from(other_facilities)
-
-            try:
-                path = nx.shortest_path(graph_copy, source=start_node, target=target_node)
-                # if len(path) > 3:
-                #     continue  # 跳过这个流
-            except nx.NetworkXNoPath:
+            target_node = facilities[self.rng.integers(len(facilities))]
+
+            # 在编译后的图上屏蔽其他地面站
+            node_mask = routing_graph.node_mask(node for node in facilities if node != target_node)
+            path = routing_graph.bfs(routing_graph.node_index[start_node], routing_graph.node_index[target_node],
+                                     node_mask=node_mask)
+            # if len(path) > 3:
+            #     continue  # 跳过这个流
+            if path is None:
                 # 如果没有路径，处理异常，例如跳过这个流
                 continue
+            path = routing_graph.path_names(path)
 
             for node in path:
                 self.counter.increment_node_usage(node)
@@ -203,73 +243,28 @@ class FlowGenerator:
     #
     #     return data[['Country', 'weights']]
 
+    def _get_demand_model(self):
+        # cities weighted by internet users, loaded once per generator
+        if self.demand_model is None:
+            self.demand_model = DemandModel(self.project_root / 'data' / 'population_data', rng=self.rng)
+        return self.demand_model
+
+    def _get_traffic_model(self):
+        if self.traffic_model is None:
+            self.traffic_model = TrafficModel(
+                self._get_demand_model(), self.time_series[:len(self.graph_list)], erlang_load, mean_holding_time,
+                holding_time_dist=holding_time_dist, pareto_shape=pareto_shape,
+                diurnal_amplitude=diurnal_amplitude)
+        return self.traffic_model
+
     def _select_points(self, n):
-        # File paths
-        file_path_city = self.project_root / 'data' / 'population_data' / 'worldcities.csv'
-        file_path_internet = self.project_root / 'data' / 'population_data' / 'world_internet_user_origin.csv'
-
-        # Load city data with geographic information and internet usage data
-        city_data = pd.read_csv(file_path_city)
-        internet_data = pd.read_csv(file_path_internet, encoding='ISO-8859-1')
-
-        # Extract relevant columns: city, country, population, latitude, and longitude
-        city_country_population = city_data[['city', 'country', 'population', 'lat', 'lng']].copy()
-
-        # Extract internet usage information: country and internet usage percentage
-        internet_usage = internet_data[['Country', '% of Population']].copy()
-
-        # Rename columns for clarity
-        internet_usage = internet_usage.rename(columns={'% of Population': 'InternetUsagePercentage'})
-        city_country_population = city_country_population.rename(
-            columns={
-                'city': 'City',
-                'country': 'Country',
-                'population': 'Population',
-                'lat': 'Latitude',
-                'lng': 'Longitude'
-            }
-        )
-
-        # Merge city population data with internet usage data
-        merged_data = pd.merge(city_country_population, internet_usage, on='Country', how='left')
-
-        # Drop rows with NaN values in Population or InternetUsagePercentage
-        cleaned_data = merged_data.dropna(subset=['Population', 'InternetUsagePercentage']).copy()
-
-        # Add a new column for the number of internet users
-        cleaned_data['InternetUsers'] = cleaned_data['Population'] * (cleaned_data['InternetUsagePercentage'] / 100)
-
-        sampled_data = cleaned_data.sample(n=n, weights='InternetUsers', replace=True)
-        start_points = list(zip(sampled_data['Longitude'], sampled_data['Latitude']))
-        # Generate second set of points with minimum distance constraint
-        end_points = []
-        min_distance = 10000  # minimum distance in km
-        
-        for first_point in start_points:
-            valid_point = False
-            max_attempts = 100
-            attempts = 0
-            
-            while not valid_point and attempts < max_attempts:
-                # Sample a candidate point
-                candidate = cleaned_data.sample(n=1, weights='InternetUsers').iloc[0]
-                candidate_point = (candidate['Longitude'], candidate['Latitude'])
-                
-                # Calculate distance using existing haversine function
-                lon1, lat1 = first_point
-                lon2, lat2 = candidate_point
-                distance = self.haversine(lat1, lon1, lat2, lon2)
-                
-                if distance >= min_distance:
-                    end_points.append(candidate_point)
-                    valid_point = True
-                
-                attempts += 1
-            
-            # If no valid point found after max attempts, take the last candidate
-            if not valid_point:
-                end_points.append(candidate_point)
-        
+        self._get_demand_model()
+
+        # end points at least 10000 km away from their start point
+        start_lons, start_lats, end_lons, end_lats = self.demand_model.sample_pairs(
+            n, min_distance=10000, max_attempts=100)
+        start_points = list(zip(start_lons.tolist(), start_lats.tolist()))
+        end_points = list(zip(end_lons.tolist(), end_lats.tolist()))
         return start_points, end_points
 
 
@@ -317,11 +312,14 @@ class FlowGenerator:
         # 提取卫星的经纬度坐标
         satellite_coords = []
         for node in satellite_data['nodes']:
-            if 'latitude' in node and 'longitude' in node:
+            # snapshots store lat/lon, older ones latitude/longitude
+            lat = node.get('lat', node.get('latitude'))
+            lon = node.get('lon', node.get('longitude'))
+            if lat is not None and lon is not None:
                 satellite_coords.append({
                     'id': node['id'],
-                    'latitude': node['latitude'],
-                    'longitude': node['longitude']
+                    'latitude': lat,
+                    'longitude': lon
                 })
         return satellite_coords
 
@@ -336,33 +334,26 @@ class FlowGenerator:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
         return R * c
 
+    def _get_spatial_index(self, graph_index, keyword):
+        # built once per snapshot and node kind, satellites move between snapshots
+        key = (graph_index, keyword)
+        if key not in self.spatial_indices:
+            self.spatial_indices[key] = SpatialIndex.from_graph(self.graph_list[graph_index], keyword)
+        return self.spatial_indices[key]
+
+    def _find_nearest_satellites(self, lats, lons, graph_index, k=1):
+        return self._get_spatial_index(graph_index, 'Sat').query(lats, lons, k)
+
+    def _find_nearest_facilities(self, lats, lons, graph_index, k=1):
+        return self._get_spatial_index(graph_index, 'Fac').query(lats, lons, k)
+
     def _find_nearest_satellite(self, lat, lon, graph_index):
-        nearest_sat = None
-        min_distance = float('inf')
-        current_graph = self.graph_list[graph_index]
-        
-        for node in current_graph.nodes(data=True):
-            node_name, node_attrs = node
-            if 'Sat' in node_name:
-                distance = self.haversine(lat, lon, node_attrs['lat'], node_attrs['lon'])
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_sat = node_name
-        return nearest_sat, min_distance
+        names, distances = self._find_nearest_satellites([lat], [lon], graph_index)
+        return names[0], float(distances[0])
 
     def _find_nearest_facility(self, lat, lon, graph_index):
-        nearest_fac = None
-        min_distance = float('inf')
-        current_graph = self.graph_list[graph_index]
-        
-        for node in current_graph.nodes(data=True):
-            node_name, node_attrs = node
-            if 'Fac' in node_name:  # Only consider facility nodes
-                distance = self.haversine(lat, lon, node_attrs['lat'], node_attrs['lon'])
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_fac = node_name
-        return nearest_fac, min_distance
+        names, distances = self._find_nearest_facilities([lat], [lon], graph_index)
+        return names[0], float(distances[0])
 
     def _load_country_shapes(self, shapefile_path):
         country_shapes = gpd.read_file(shapefile_path)
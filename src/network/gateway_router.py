@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 16:10
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : gateway_router.py
+
+import numpy as np
+
+from src.utils import Logger
+
+logger = Logger().get_logger()
+
+
+class GatewayRouter:
+    """One shortest-path tree per gateway of a compiled snapshot.
+
+    Trees are rooted at the gateways and may not pass through any facility, which is the
+    "other facilities removed" rule applied once for all flows. Links cost the same in both
+    directions, so the tree path from a gateway to a satellite, reversed, is the satellite's
+    shortest route to that gateway, and a flow's route is one walk up its tree.
+
+    Only links with at least min_bandwidth residual bandwidth are used. When allocations push
+    a link below that, only the trees that contain the link are recomputed; losing a link
+    outside a tree leaves that tree's paths shortest. Links released back above it refresh
+    every tree. The distances over all links regardless of bandwidth are kept as well, so
+    callers can tell a tree path that had to detour around saturated links.
+    """
+
+    def __init__(self, routing_graph, gateways, weight=None, min_bandwidth=0.0):
+        self.routing_graph = routing_graph
+        self.weight = weight
+        self.min_bandwidth = min_bandwidth
+        self.gateways = [routing_graph.node_index[name] for name in gateways if name in routing_graph.node_index]
+        self.tree_row = {gateway: row for row, gateway in enumerate(self.gateways)}
+        self.closed_nodes = routing_graph.node_mask(gateways)
+
+        n_tree, n_edge = len(self.gateways), routing_graph.num_edges
+        self.predecessors = np.full((n_tree, len(routing_graph)), -9999, dtype=np.int32)
+        self.distances = np.full((n_tree, len(routing_graph)), np.inf)
+        self.tree_edges = np.zeros((n_tree, n_edge), dtype=bool)
+        self.usable = routing_graph.bandwidth >= min_bandwidth
+        self.refreshes = 0
+        self.base_distances = np.full((n_tree, len(routing_graph)), np.inf)
+        if n_tree:
+            self.base_distances[:] = routing_graph.shortest_path_trees(
+                self.gateways, weight, closed_nodes=self.closed_nodes)[0]
+        self._build(list(range(n_tree)))
+
+    def _build(self, rows):
+        if not rows:
+            return
+        graph = self.routing_graph
+        distances, predecessors = graph.shortest_path_trees(
+            [self.gateways[row] for row in rows], self.weight,
+            edge_mask=~self.usable, closed_nodes=self.closed_nodes)
+        for row, dist, tree in zip(rows, np.atleast_2d(distances), np.atleast_2d(predecessors)):
+            self.predecessors[row] = tree
+            self.distances[row] = dist
+            self.tree_edges[row] = False
+            nodes = np.flatnonzero(tree >= 0).tolist()
+            self.tree_edges[row, [graph.edge_index[(node, int(tree[node]))] for node in nodes]] = True
+        self.refreshes += len(rows)
+
+    def path(self, source, gateway, max_detour=None):
+        """Node ids from source up the tree of gateway, or None if the gateway is unreachable.
+
+        With max_detour, paths costing more than that over the distance with every link
+        usable are not returned either.
+        """
+        row = self.tree_row.get(gateway)
+        if row is None:
+            return None
+        if max_detour is not None and self.distances[row, source] > self.base_distances[row, source] + max_detour:
+            return None
+        tree = self.predecessors[row]
+        path = [source]
+        while path[-1] != gateway:
+            next_hop = tree[path[-1]]
+            if next_hop < 0:
+                return None
+            path.append(int(next_hop))
+        return path
+
+    def update(self, edges):
+        """Re-check the residual bandwidth of changed edges and refresh the trees they break."""
+        edges = np.asarray(edges, dtype=np.int64)
+        now_usable = self.routing_graph.bandwidth[edges] >= self.min_bandwidth
+        lost = edges[self.usable[edges] & ~now_usable]
+        gained = edges[~self.usable[edges] & now_usable]
+        self.usable[edges] = now_usable
+        if len(gained):
+            # a released link can shorten any tree
+            logger.debug(f"{len(gained)} links are usable again, refreshing all {len(self.gateways)} trees")
+            self._build(list(range(len(self.gateways))))
+        elif len(lost):
+            stale = np.flatnonzero(self.tree_edges[:, lost].any(axis=1)).tolist()
+            logger.debug(f"{len(lost)} links fell below {self.min_bandwidth}, refreshing {len(stale)} trees")
+            self._build(stale)
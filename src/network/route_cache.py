@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 14:30
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : route_cache.py
+
+
+class RouteCache:
+    """Last route found per (source, target, path type), reused while it stays usable.
+
+    The +Grid topology barely changes between snapshots, so a route found for one snapshot
+    is usually still valid in the next. lookup() hands a cached route to a validator that
+    checks it against the current snapshot hop by hop; a route that fails is dropped and
+    the caller searches again.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.routes)
+
+    def lookup(self, key, validate):
+        """Cached route of key if validate(route) accepts it, else None."""
+        route = self.routes.get(key)
+        if route is None:
+            self.misses += 1
+            return None
+        if not validate(route):
+            del self.routes[key]
+            self.invalidations += 1
+            return None
+        self.hits += 1
+        return route
+
+    def store(self, key, route):
+        self.routes[key] = route
+
+    def clear(self):
+        self.routes.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses + self.invalidations
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        return (f"Route cache: {self.hits} hits, {self.misses} misses, {self.invalidations} invalidations "
+                f"(hit rate {self.hit_rate * 100:.1f}%)")
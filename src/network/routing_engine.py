@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 10:05
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : routing_engine.py
+
+import heapq
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+
+class RoutingGraph:
+    """Array form of one snapshot for routing.
+
+    Nodes get integer ids in graph order and node_names maps them back. Adjacency is CSR with
+    both directions of every undirected edge, and entry_edge maps each CSR entry to its
+    undirected edge id. Per-edge weight, bandwidth and range are float32 arrays indexed by edge
+    id, so bandwidth allocated in one direction is seen from both.
+
+    Searches take optional exclusion masks: node_mask over node ids and edge_mask over edge
+    ids, True meaning the node or edge is hidden.
+    """
+
+    def __init__(self, node_names, edge_u, edge_v, weight, bandwidth, range_):
+        self.node_names = list(node_names)
+        self.node_index = {name: idx for idx, name in enumerate(self.node_names)}
+        self.edge_u = np.asarray(edge_u, dtype=np.int32)
+        self.edge_v = np.asarray(edge_v, dtype=np.int32)
+        self.weight = np.asarray(weight, dtype=np.float32)
+        self.bandwidth = np.asarray(bandwidth, dtype=np.float32)
+        self.range = np.asarray(range_, dtype=np.float32)
+        self.edge_index = {}
+        for e, (u, v) in enumerate(zip(self.edge_u.tolist(), self.edge_v.tolist())):
+            self.edge_index[(u, v)] = e
+            self.edge_index[(v, u)] = e
+
+        # canonical CSR over both directions, entries sorted by (source, destination)
+        n = len(self.node_names)
+        rows = np.concatenate([self.edge_u, self.edge_v])
+        cols = np.concatenate([self.edge_v, self.edge_u])
+        edges = np.tile(np.arange(len(self.edge_u), dtype=np.int32), 2)
+        order = np.lexsort((cols, rows))
+        self.entry_row = rows[order]
+        self.indices = cols[order]
+        self.entry_edge = edges[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.entry_row, minlength=n))]).astype(np.int32)
+        self._matrices = {}  # weighting -> CSR matrix of the whole snapshot
+        self._scratch = {}  # weighting -> CSR matrix whose data is replaced per masked search
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Compile a NetworkX snapshot. Missing weights count as one hop, missing bandwidth as zero."""
+        node_names = list(graph.nodes())
+        node_index = {name: idx for idx, name in enumerate(node_names)}
+        edge_u, edge_v, weight, bandwidth, range_ = [], [], [], [], []
+        for u, v, data in graph.edges(data=True):
+            edge_u.append(node_index[u])
+            edge_v.append(node_index[v])
+            weight.append(data.get('weight', 1.0))
+            bandwidth.append(data.get('bandwidth', 0.0))
+            range_.append(data.get('range', np.nan))
+        return cls(node_names, edge_u, edge_v, weight, bandwidth, range_)
+
+    def __len__(self):
+        return len(self.node_names)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_u)
+
+    def node_mask(self, names=()):
+        """Node mask with the given node names hidden."""
+        mask = np.zeros(len(self.node_names), dtype=bool)
+        mask[[self.node_index[name] for name in names if name in self.node_index]] = True
+        return mask
+
+    def path_ids(self, names):
+        return [self.node_index[name] for name in names]
+
+    def path_names(self, path):
+        return [self.node_names[node] for node in path]
+
+    def path_edges(self, path):
+        """Edge ids along a path of node ids, or None if a hop is not an edge."""
+        try:
+            return np.array([self.edge_index[(u, v)] for u, v in zip(path[:-1], path[1:])], dtype=np.int64)
+        except KeyError:
+            return None
+
+    def edge_costs(self, weight=None):
+        """Per-edge cost of a weighting: None counts hops, 'weight' or 'range' use that attribute."""
+        if weight is None:
+            return np.ones(self.num_edges, dtype=np.float32)
+        if weight == 'weight':
+            return self.weight
+        if weight == 'range':
+            return self.range
+        raise ValueError(f"Unknown routing weight: {weight}")
+
+    def _matrix(self, weight, node_mask=None, edge_mask=None):
+        """CSR matrix with the costs of a weighting, hidden entries set to infinity."""
+        if weight not in self._matrices:
+            data = self.edge_costs(weight)[self.entry_edge].astype(np.float64)
+            shape = (len(self), len(self))
+            self._matrices[weight] = csr_matrix((data, self.indices, self.indptr), shape=shape)
+            self._scratch[weight] = csr_matrix((data.copy(), self.indices, self.indptr), shape=shape)
+        matrix = self._matrices[weight]
+        if node_mask is None and edge_mask is None:
+            return matrix
+
+        hidden = np.zeros(len(self.indices), dtype=bool)
+        if node_mask is not None:
+            hidden |= node_mask[self.entry_row] | node_mask[self.indices]
+        if edge_mask is not None:
+            hidden |= edge_mask[self.entry_edge]
+        # same sparsity structure, so only the data array is swapped
+        scratch = self._scratch[weight]
+        scratch.data = np.where(hidden, np.inf, matrix.data)
+        return scratch
+
+    def shortest_path(self, source, target, weight=None, node_mask=None, edge_mask=None):
+        """Shortest path between node ids as a list of node ids, or None if there is none.
+
+        With weight=None every edge costs one hop, otherwise the edge attribute is the cost.
+        """
+        if node_mask is not None and (node_mask[source] or node_mask[target]):
+            return None
+        if source == target:
+            return [source]
+        matrix = self._matrix(weight, node_mask, edge_mask)
+        dist, predecessors = dijkstra(matrix, directed=True, indices=source, return_predecessors=True)
+        if np.isinf(dist[target]):
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(int(predecessors[path[-1]]))
+        return path[::-1]
+
+    def shortest_path_trees(self, sources, weight=None, edge_mask=None, closed_nodes=None):
+        """Shortest-path trees rooted at every source node id in one Dijkstra call.
+
+        Args:
+            closed_nodes: node mask of nodes a path may start from but never enter
+
+        Returns:
+            dist, predecessors: (source x node) arrays as returned by csgraph dijkstra
+        """
+        matrix = self._matrix(weight)
+        if edge_mask is not None or closed_nodes is not None:
+            hidden = np.zeros(len(self.indices), dtype=bool)
+            if edge_mask is not None:
+                hidden |= edge_mask[self.entry_edge]
+            if closed_nodes is not None:
+                hidden |= closed_nodes[self.indices]
+            scratch = self._scratch[weight]
+            scratch.data = np.where(hidden, np.inf, matrix.data)
+            matrix = scratch
+        return dijkstra(matrix, directed=True, indices=np.asarray(sources), return_predecessors=True)
+
+    def bfs(self, source, target, node_mask=None, edge_mask=None):
+        """Fewest-hop path, ties broken arbitrarily."""
+        return self.shortest_path(source, target, None, node_mask, edge_mask)
+
+    def path_cost(self, path, weight=None):
+        edges = self.path_edges(path)
+        return float(self.edge_costs(weight)[edges].sum())
+
+    def k_shortest_paths(self, source, target, k=4, weight=None, node_mask=None, edge_mask=None):
+        """Up to k loopless paths in order of increasing cost (Yen's algorithm)."""
+        first = self.shortest_path(source, target, weight, node_mask, edge_mask)
+        if first is None:
+            return []
+        base_nodes = np.zeros(len(self), dtype=bool) if node_mask is None else node_mask
+        base_edges = np.zeros(self.num_edges, dtype=bool) if edge_mask is None else edge_mask
+
+        paths = [first]
+        seen = {tuple(first)}
+        candidates = []
+        counter = 0
+        while len(paths) < k:
+            previous = paths[-1]
+            for i in range(len(previous) - 1):
+                spur_node = previous[i]
+                root = previous[:i + 1]
+
+                # hide the next hop of every found path sharing this root, and the root itself
+                spur_edges = base_edges.copy()
+                for path in paths:
+                    if len(path) > i + 1 and path[:i + 1] == root:
+                        spur_edges[self.edge_index[(path[i], path[i + 1])]] = True
+                spur_nodes = base_nodes.copy()
+                spur_nodes[root[:-1]] = True
+
+                spur_path = self.shortest_path(spur_node, target, weight, spur_nodes, spur_edges)
+                if spur_path is None:
+                    continue
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    counter += 1
+                    heapq.heappush(candidates, (self.path_cost(candidate, weight), counter, candidate))
+
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[2])
+        return paths
+
+    def find_disjoint_pair(self, source, target, weight=None, disjoint='link', node_mask=None, edge_mask=None):
+        """Two disjoint paths with the least total cost (Suurballe's algorithm).
+
+        Args:
+            disjoint: 'link' for paths sharing no edge, 'node' for paths sharing no intermediate node
+            weight, node_mask, edge_mask: as in shortest_path
+
+        Returns:
+            (first, second) lists of node ids, the cheaper path first, or None if no pair exists
+        """
+        if disjoint not in ('link', 'node'):
+            raise ValueError(f"Unknown disjointness: {disjoint}")
+        if source == target or (node_mask is not None and (node_mask[source] or node_mask[target])):
+            return None
+
+        # directed arcs of the visible graph
+        hidden = np.zeros(len(self.indices), dtype=bool)
+        if node_mask is not None:
+            hidden |= node_mask[self.entry_row] | node_mask[self.indices]
+        if edge_mask is not None:
+            hidden |= edge_mask[self.entry_edge]
+        rows, cols = self.entry_row[~hidden], self.indices[~hidden]
+        costs = self.edge_costs(weight)[self.entry_edge[~hidden]].astype(np.float64)
+        n = len(self)
+
+        if disjoint == 'node':
+            # split every node v into v (in) and v + n (out) joined by a zero-cost arc, so that
+            # link-disjoint paths from source out to target in are node-disjoint in the snapshot
+            nodes = np.arange(n, dtype=rows.dtype)
+            rows = np.concatenate([rows + n, nodes])
+            cols = np.concatenate([cols, nodes + n])
+            costs = np.concatenate([costs, np.zeros(n)])
+            source, n = source + n, 2 * n
+
+        pair = _suurballe(rows, cols, costs, n, source, target)
+        if pair is None:
+            return None
+        if disjoint == 'node':
+            pair = [_merge_split_nodes(path, len(self)) for path in pair]
+        return tuple(sorted(pair, key=lambda path: self.path_cost(path, weight)))
+
+
+def _arc_matrix(rows, cols, costs, n):
+    # canonical CSR that keeps zero-cost arcs as edges
+    order = np.lexsort((cols, rows))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))])
+    return csr_matrix((costs[order], cols[order], indptr), shape=(n, n))
+
+
+def _tree_path(predecessors, source, target):
+    path = [target]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
+
+
+def _suurballe(rows, cols, costs, n, source, target):
+    """Two arc-disjoint source-target paths of least total cost in a directed graph, or None."""
+    dist, predecessors = dijkstra(_arc_matrix(rows, cols, costs, n), indices=source, return_predecessors=True)
+    if np.isinf(dist[target]):
+        return None
+    first = _tree_path(predecessors, source, target)
+    first_arcs = set(zip(first[:-1], first[1:]))
+
+    # residual graph on reduced costs (all non-negative): drop the arcs of the first path and
+    # their twins, then add every first-path arc reversed at zero cost
+    reachable = ~np.isinf(dist[rows]) & ~np.isinf(dist[cols])
+    first_u = np.array(first[:-1])
+    first_v = np.array(first[1:])
+    on_first = np.zeros(len(rows), dtype=bool)
+    keys = rows.astype(np.int64) * n + cols
+    on_first |= np.isin(keys, first_u.astype(np.int64) * n + first_v)
+    on_first |= np.isin(keys, first_v.astype(np.int64) * n + first_u)
+    keep = reachable & ~on_first
+    reduced = np.maximum(costs[keep] + dist[rows[keep]] - dist[cols[keep]], 0)
+    residual = _arc_matrix(np.concatenate([rows[keep], first_v]), np.concatenate([cols[keep], first_u]),
+                           np.concatenate([reduced, np.zeros(len(first_u))]), n)
+
+    dist, predecessors = dijkstra(residual, indices=source, return_predecessors=True)
+    if np.isinf(dist[target]):
+        return None
+    second = _tree_path(predecessors, source, target)
+
+    # an arc of the second path running against the first cancels both, the rest form the pair
+    arcs = set(first_arcs)
+    for u, v in zip(second[:-1], second[1:]):
+        if (v, u) in arcs:
+            arcs.discard((v, u))
+        else:
+            arcs.add((u, v))
+    successors = {}
+    for u, v in arcs:
+        successors.setdefault(u, []).append(v)
+
+    pair = []
+    for _ in range(2):
+        path = [source]
+        while path[-1] != target:
+            path.append(successors[path[-1]].pop())
+        pair.append(path)
+    return pair
+
+
+def _merge_split_nodes(path, n):
+    # map split in/out node ids back to snapshot ids, the in-out hop collapses to one node
+    merged = []
+    for node in path:
+        node %= n
+        if not merged or merged[-1] != node:
+            merged.append(node)
+    return merged
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 21:15
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : spatial_index.py
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS = 6371  # km, same sphere as FlowGenerator.haversine
+
+
+def to_unit_vectors(lats, lons):
+    """(n, 3) unit vectors of points given in degrees."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class SpatialIndex:
+    """KD-tree over the unit vectors of named points for nearest-node lookups.
+
+    The straight-line (chord) distance between unit vectors grows monotonically with the
+    great-circle distance, so the nearest neighbours in 3D are the nearest on the sphere.
+    """
+
+    def __init__(self, names, lats, lons):
+        self.names = np.asarray(names, dtype=object)
+        self.tree = cKDTree(to_unit_vectors(lats, lons)) if len(self.names) else None
+
+    @classmethod
+    def from_graph(cls, graph, keyword):
+        """Index the nodes of a snapshot whose name contains keyword ('Sat' or 'Fac')."""
+        names, lats, lons = [], [], []
+        for node, attrs in graph.nodes(data=True):
+            if keyword in node and 'lat' in attrs and 'lon' in attrs:
+                names.append(node)
+                lats.append(attrs['lat'])
+                lons.append(attrs['lon'])
+        return cls(names, lats, lons)
+
+    def __len__(self):
+        return len(self.names)
+
+    def query(self, lats, lons, k=1):
+        """Nearest k nodes of every query point.
+
+        Returns:
+            names: node names, shape (n,) for k=1 else (n, k)
+            distances: great-circle distances in km, same shape as names
+        """
+        if self.tree is None:
+            raise ValueError("spatial index is empty")
+        k = min(k, len(self.names))
+        chords, rows = self.tree.query(to_unit_vectors(lats, lons), k=k)
+        distances = 2 * EARTH_RADIUS * np.arcsin(np.clip(chords / 2, 0, 1))
+        return self.names[rows], distances
@@ -3,13 +3,16 @@
 # @Author  : DanielFu
 # @Email   : daniel_fys@163.com
 # @File    : topo_builder.py
+import os
 import json
 import networkx as nx
-from src.utils import save_graph_after_modification, get_time_list, approx_time, get_time_list
-from bisect import bisect_left
+import numpy as np
+from src.utils import save_graph_after_modification, get_time_list, approx_time, set_node_coordinates
+from src.utils.tools import get_graph_list, save_graph_list
 from pathlib import Path
 import pandas as pd
 from src.utils.logger import Logger
+from src.utils.time_align import to_epoch_ns, nearest_grid_indices
 
 logger = Logger().get_logger()
 
@@ -19,18 +22,25 @@ class TopoBuilder:
         self.graph_path = self.project_root / 'graphs'
         self.data_directory = self.project_root / 'data'
         self.sat_distance_file = self.project_root / 'data' / 'aer_data' / 'inter_satellite_distances.csv'
+        self.fac_sat_chains_directory = self.project_root / 'data' / 'fac_sat_chains'
+        self.chain_index_file = self.data_directory / 'fac_sat_chain_index.npz'
         self.graph_list = []
         self.time_series = get_time_list()
 
     def gen_topo(self):
         '''create graph for each time step'''
-        for index in range(len(self.time_series)):
+        self.graph_list = []
+        for time in self.time_series:
             graph = nx.Graph()
-            self._add_sat_to_topo(graph, index)
-            # self._add_fac_to_topo(graph, index)
-            # self._add_bandwidth_to_edges(graph, index)
+            graph.graph['time'] = time.isoformat()
+            self.graph_list.append(graph)
 
+        self._add_sat_to_topo(self.graph_list)
+        # self._add_fac_to_topo(self.graph_list)
+        # self._add_bandwidth_to_edges(graph, index)
 
+        # Save graphs to files in snapshot_format
+        save_graph_list(self.graph_list, self.graph_path, indent=4)
 
         # form graph_list
         # self.load_graphs()
@@ -38,7 +48,7 @@ class TopoBuilder:
         # for index in range(len(self.graph_list)):
         #     graph = self.graph_list[index]
         #     self._add_weight_to_edges(graph, index)
-        #     self._add_sat_lla_to_topo(graph, index)
+        # self._add_sat_lla_to_topo(self.graph_list)
 
     @save_graph_after_modification
     def _add_bandwidth_to_edges(self, graph, index):
@@ -57,9 +67,9 @@ class TopoBuilder:
                 graph[u][v]['share_degree'] = [0] * self.slot_num
 
     # add satellite links to topo
-    def _add_sat_to_topo(self, graph, index):
-        '''add satellite links to topo'''
-        logger.info(f"Adding satellite links to topo at index {index} ...")
+    def _add_sat_to_topo(self, graph_list):
+        '''add satellite links of every time step to topo in one pass over the distance file'''
+        logger.info(f"Adding satellite links to {len(graph_list)} snapshots ...")
         try:
             sat_df = pd.read_csv(self.sat_distance_file)
             sat_df['Distance'] = sat_df['Distance'].round(0)
@@ -68,116 +78,131 @@ class TopoBuilder:
             return
 
         try:
-            # Iterate over each time step
-            for index in range(len(self.time_series)):
-                counter = 0
-                graph = nx.Graph()
-                time = self.time_series[index]
-                links = sat_df[pd.to_datetime(sat_df['Time']) == time]
-                
-                for _, row in links.iterrows():
-                    source_node = row['SourceSatellite']
-                    target_node = row['TargetSatellite'] 
-                    distance = row['Distance']
-                    graph.add_edge(source_node, target_node, weight=distance)
-                    counter += 1
-
-                # Save graph to file
-                graph_path = self.graph_path / f"graph{index}.json"
-                data = nx.node_link_data(graph)
-                with open(graph_path, 'w') as f:
-                    json.dump(data, f, indent=4)
-                logger.debug(f"Graph {index} has {counter} edges")
-                
+            # Convert the time column once and keep only rows that fall on a snapshot
+            epochs = to_epoch_ns(pd.to_datetime(sat_df['Time']))
+            indices, valid = nearest_grid_indices(epochs, self.time_series, tolerance=0)
+            sat_df = sat_df[valid].assign(index=indices[valid])
+
+            for index, links in sat_df.groupby('index', sort=True):
+                graph_list[index].add_edges_from(
+                    (source_node, target_node, {'weight': distance})
+                    for source_node, target_node, distance in zip(
+                        links['SourceSatellite'], links['TargetSatellite'], links['Distance'].tolist())
+                )
+                logger.debug(f"Graph {index} has {len(links)} edges")
+
         except Exception as e:
             logger.error(f"Error adding satellite links to topo: {e}")
 
 
     # add facility to topo
-    @save_graph_after_modification
-    def _add_fac_to_topo(self, graph, index):
-        logger.info(f"Adding facility to topo at index {index} ...")
-        # Iterate over each file in the directory
-        fac_sat_chains_directory = self.project_root / 'data' / 'fac_sat_chains'
-        for file_path in fac_sat_chains_directory.glob('*.csv'):
+    def _add_fac_to_topo(self, graph_list):
+        '''add satellite-facility links of every time step to topo from the chain index'''
+        logger.info(f"Adding facility links to {len(graph_list)} snapshots ...")
+        chain_index = self._load_chain_index()
+
+        for index, links in chain_index.groupby('index', sort=True):
+            graph_list[index].add_edges_from(
+                (node_a, node_b, {'weight': distance})
+                for node_a, node_b, distance in zip(links['node_a'], links['node_b'], links['distance'].tolist())
+            )
+            logger.debug(f"Added {len(links)} facility links to graph {index}")
+
+        # persist the modified snapshots once, as save_graph_after_modification did per graph
+        save_graph_list(graph_list, self.graph_path, indent=4)
+
+    def _load_chain_index(self):
+        '''all chain files as one (node_a, node_b, index, distance) table, cached until a file changes'''
+        chain_files = sorted(self.fac_sat_chains_directory.glob('*.csv'))
+        signature = json.dumps({
+            'files': [[f.name, f.stat().st_mtime_ns, f.stat().st_size] for f in chain_files],
+            'times': [t.isoformat() for t in (self.time_series[0], self.time_series[-1])] if self.time_series else [],
+            'num_times': len(self.time_series),
+        })
+        if self.chain_index_file.exists():
+            try:
+                with np.load(self.chain_index_file, allow_pickle=False) as data:
+                    if str(data['signature']) == signature:
+                        logger.debug(f"Using cached chain index {self.chain_index_file}")
+                        names = data['names']
+                        return pd.DataFrame({
+                            'node_a': pd.Categorical.from_codes(data['node_a'], names),
+                            'node_b': pd.Categorical.from_codes(data['node_b'], names),
+                            'distance': data['distance'],
+                            'index': data['index'],
+                        })
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Discarding unreadable chain index {self.chain_index_file}: {e}")
+
+        tables = []
+        for file_path in chain_files:
             # Parse node names from the filename
             node_a, node_b = file_path.stem.split(' To ')
-
-            # Read the file content
-            df = pd.read_csv(file_path)
-
-            # Get the current time from time_series
-            current_time = pd.to_datetime(self.time_series[index])
-            
-            # Find the row in df that matches the current time
-            matching_row = df[pd.to_datetime(df['Time']) == current_time]
-            
-            if not matching_row.empty:
-                # Get the distance for the matching time
-                distance = matching_row['Distance'].iloc[0]
-                distance = distance.round(0)
-                
-                # Add nodes and edge with the distance
-                if not graph.has_node(node_a):
-                    graph.add_node(node_a)
-                if not graph.has_node(node_b):
-                    graph.add_node(node_b)
-                    
-                graph.add_edge(node_a, node_b, weight=distance)
-                logger.debug(f"Edge ({node_a}, {node_b}) added to graph")
-
-    @save_graph_after_modification
-    def _add_sat_lla_to_topo(self, graph, index):
-        # Load LLA data for all satellites from CSV files
-        sat_lla_data = {}
-        lla_reports_dir = f"{self.data_directory}/sat_lla_reports"
-        if not os.path.exists(lla_reports_dir):
-            print(f"Warning: LLA reports directory {lla_reports_dir} does not exist.")
+            df = pd.read_csv(file_path, usecols=['Time', 'Distance'])
+            tables.append(pd.DataFrame({
+                'node_a': node_a,
+                'node_b': node_b,
+                'time': pd.to_datetime(df['Time']),
+                'distance': df['Distance'].round(0),
+            }))
+
+        if tables:
+            chain_index = pd.concat(tables, ignore_index=True)
+            # keep rows that fall exactly on a snapshot, first sample per chain and snapshot
+            indices, valid = nearest_grid_indices(to_epoch_ns(chain_index['time']), self.time_series, tolerance=0)
+            chain_index = chain_index[valid].assign(index=indices[valid]).drop(columns='time')
+            chain_index = chain_index.drop_duplicates(['node_a', 'node_b', 'index'], keep='first')
+        else:
+            chain_index = pd.DataFrame({'node_a': [], 'node_b': [], 'distance': [], 'index': []})
+        # node names as codes into one shared category list, so the table saves without pickle
+        names = pd.Index(pd.unique(pd.concat([chain_index['node_a'], chain_index['node_b']]).astype(str)))
+        chain_index = pd.DataFrame({
+            'node_a': pd.Categorical(chain_index['node_a'].astype(str), categories=names),
+            'node_b': pd.Categorical(chain_index['node_b'].astype(str), categories=names),
+            'distance': chain_index['distance'].to_numpy(dtype=float),
+            'index': chain_index['index'].to_numpy(dtype=np.int32),
+        })
+
+        tmp_path = self.chain_index_file.with_name(f"{self.chain_index_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, signature=np.array(signature), names=names.to_numpy(dtype=str),
+                     node_a=chain_index['node_a'].cat.codes.to_numpy(dtype=np.int32),
+                     node_b=chain_index['node_b'].cat.codes.to_numpy(dtype=np.int32),
+                     distance=chain_index['distance'].to_numpy(), index=chain_index['index'].to_numpy())
+        os.replace(tmp_path, self.chain_index_file)
+        logger.info(f"Built chain index with {len(chain_index)} rows from {len(chain_files)} chain files")
+        return chain_index
+
+    def _add_sat_lla_to_topo(self, graph_list):
+        '''write lat/lon of every satellite into every snapshot from the LLA reports'''
+        lla_reports_dir = self.data_directory / 'sat_lla_reports'
+        if not lla_reports_dir.exists():
+            logger.warning(f"LLA reports directory {lla_reports_dir} does not exist.")
             return
 
-        # List all CSV files in the LLA reports directory
-        lla_files = [f for f in os.listdir(lla_reports_dir) if f.endswith('_lla.csv')]
+        lla_files = sorted(lla_reports_dir.glob('*_lla.csv'))
         if not lla_files:
-            print(f"Warning: No LLA CSV files found in {lla_reports_dir}")
+            logger.warning(f"No LLA CSV files found in {lla_reports_dir}")
             return
 
-        # Load all satellites' LLA data into a dictionary
-        for filename in lla_files:
-            # Extract satellite name from filename
-            sat_name = filename[:-8]  # Remove '_lla.csv' from the end
-            lla_filepath = os.path.join(lla_reports_dir, filename)
-            lla_df = pd.read_csv(lla_filepath)
-            # Ensure 'Time' column is in datetime format
-            lla_df['Time'] = pd.to_datetime(lla_df['Time'])
-            # Store the DataFrame in the dictionary
-            sat_lla_data[sat_name] = lla_df
-
-        # For each satellite, get the LLA data
-        for sat_name, lla_df in sat_lla_data.items():
-            # Iterate over each row in the DataFrame to match times with graphs
-            for _, row in lla_df.iterrows():
-                lla_time = row['Time']
-                latitude = row['Latitude']
-                longitude = row['Longitude']
-
-                # Use find_time_index to determine the closest time index
-                idx = self.find_time_index(lla_time)
-
-                # Ensure that the found index is valid
-                if idx is None or idx < 0 or idx >= len(self.graph_list):
-                    print(f"Warning: Time {lla_time} not found in time series.")
-                    continue
-                if idx == index:
-                    # Add or update the node with latitude and longitude attributes
-                    if graph.has_node(sat_name):
-                        # Update the node attributes
-                        graph.nodes[sat_name]['latitude'] = latitude
-                        graph.nodes[sat_name]['longitude'] = longitude
-                    else:
-                        # Add the node with latitude and longitude attributes
-                        graph.add_node(sat_name, latitude=latitude, longitude=longitude)
-
-
+        # (satellite x snapshot) coordinates, NaN where a satellite has no report
+        sat_names = [file_path.name[:-len('_lla.csv')] for file_path in lla_files]
+        lats = np.full((len(sat_names), len(graph_list)), np.nan)
+        lons = np.full((len(sat_names), len(graph_list)), np.nan)
+        for row, file_path in enumerate(lla_files):
+            lla_df = pd.read_csv(file_path, usecols=['Time', 'Latitude', 'Longitude'])
+            # snap every report to its nearest snapshot, later reports win on the same slot
+            indices, _ = nearest_grid_indices(to_epoch_ns(pd.to_datetime(lla_df['Time'])), self.time_series)
+            lats[row, indices] = lla_df['Latitude'].to_numpy()
+            lons[row, indices] = lla_df['Longitude'].to_numpy()
+
+        for graph in graph_list:
+            graph.add_nodes_from(sat_names)
+        set_node_coordinates(graph_list, sat_names, lats, lons)
+        logger.info(f"Added coordinates of {len(sat_names)} satellites to {len(graph_list)} snapshots")
+
+        # persist the modified snapshots once, as save_graph_after_modification did per graph
+        save_graph_list(graph_list, self.graph_path, indent=4)
 
     @save_graph_after_modification
     def _add_weight_to_edges(self, graph, idx):
@@ -208,26 +233,6 @@ class TopoBuilder:
                     graph[u][v]['betweenness'] = bc_value
                     # print(f"At index {idx}, Edge ({u}, {v}): Betweenness Centrality = {bc_value}")
 
-    def find_time_index(self, target_time):
-        # Use bisect_left to find the insertion position that would keep self.time_series sorted
-        pos = bisect_left(self.time_series, target_time)
-
-        # If pos is 0, it means target_time is less than all elements in self.time_series
-        if pos == 0:
-            return 0
-        # If pos is len(self.time_series), it means target_time is greater than all elements in self.time_series
-        elif pos == len(self.time_series):
-            return len(self.time_series) - 1
-        # Otherwise, find the closest time by comparing with the previous element
-        else:
-            prev_time = self.time_series[pos - 1]
-            next_time = self.time_series[pos]
-            # Return the index of the time which is closest to target_time
-            if (target_time - prev_time) <= (next_time - target_time):
-                return pos - 1
-            else:
-                return pos
-
     # @save_graph_after_modification
     # def add_weight_to_edges(self):
     #     def _generate_node_lists():
@@ -263,20 +268,11 @@ class TopoBuilder:
     #                     print(f"At index {index}, Edge ({u}, {v}): Betweenness Centrality = {bc_value}")
 
     def load_graphs(self):
-        # Load all graphs and store them in a dictionary with their corresponding times
-        for index, _ in enumerate(self.time_series):
-            graph_file = self.graph_path / f"graph{index}.json"
-            if graph_file.exists():
-                try:
-                    with open(graph_file, 'r') as file:
-                        data = json.load(file)
-                        graph = nx.node_link_graph(data)
-                        self.graph_list.append(graph)
-                except json.JSONDecodeError as e:
-                    print(f"Error loading {graph_file}: {e}")
-            else:
-                print(f"File {graph_file} does not exist.")
-
+        # Load all graphs in time order, from the store or the json files per snapshot_format
+        try:
+            self.graph_list.extend(get_graph_list(self.graph_path)[:len(self.time_series)])
+        except json.JSONDecodeError as e:
+            print(f"Error loading graphs from {self.graph_path}: {e}")
 
 if __name__ == "__main__":
     builder = TopoBuilder()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 23:20
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : traffic_model.py
+
+import numpy as np
+
+from src.utils import Logger
+from src.utils.time_grid import TimeGrid
+
+logger = Logger().get_logger()
+
+# cities are grouped into 24 one-hour longitude bands that share a local time
+NUM_REGIONS = 24
+
+
+class TrafficModel:
+    """Time-driven flow arrivals on top of a DemandModel.
+
+    Flows arrive as a Poisson process with rate erlang_load / mean_holding_time, so the mean
+    number of flows in progress equals the offered load in Erlang. The rate of every region
+    follows a sinusoid over its local solar time that peaks at peak_hour and averages to one
+    over a day. Holding times are exponential or Pareto with the same mean, and each flow lasts
+    for the snapshots its holding time spans from a uniform arrival offset in the interval.
+    """
+
+    def __init__(self, demand_model, time_series, erlang_load, mean_holding_time,
+                 holding_time_dist='exponential', pareto_shape=1.5,
+                 diurnal_amplitude=0.5, peak_hour=20, min_distance=10000):
+        if holding_time_dist not in ('exponential', 'pareto'):
+            raise ValueError(f"Unknown holding time distribution: {holding_time_dist}")
+        if holding_time_dist == 'pareto' and pareto_shape <= 1:
+            raise ValueError("Pareto shape must be greater than 1 for a finite mean holding time")
+
+        self.demand_model = demand_model
+        self.rng = demand_model.rng
+        self.time_grid = time_series if isinstance(time_series, TimeGrid) else TimeGrid(time_series)
+        self.erlang_load = erlang_load
+        self.mean_holding_time = mean_holding_time
+        self.holding_time_dist = holding_time_dist
+        self.pareto_shape = pareto_shape
+        self.diurnal_amplitude = diurnal_amplitude
+        self.peak_hour = peak_hour
+        self.min_distance = min_distance
+
+        # snapshot interval in seconds
+        steps = np.diff(self.time_grid.epochs)
+        self.interval = float(np.median(steps)) / 1e9 if len(steps) else float(mean_holding_time)
+
+        # cities sorted by region, with one cumulative weight array per region
+        lons = demand_model.longitudes
+        regions = ((lons + 180) // (360 / NUM_REGIONS)).astype(int) % NUM_REGIONS
+        self.city_order = np.argsort(regions, kind='stable')
+        self.region_bounds = np.searchsorted(regions[self.city_order], np.arange(NUM_REGIONS + 1))
+        weights = demand_model.weights[self.city_order]
+        self.region_cdfs = [np.cumsum(weights[self.region_bounds[r]:self.region_bounds[r + 1]])
+                            for r in range(NUM_REGIONS)]
+        self.region_weights = np.array([cdf[-1] if len(cdf) else 0.0 for cdf in self.region_cdfs])
+        # local solar time offset of each band centre, in hours
+        self.region_hours = (np.arange(NUM_REGIONS) + 0.5) * 24 / NUM_REGIONS - 12
+
+    @property
+    def arrival_rate(self):
+        """Mean flow arrivals per second over a day."""
+        return self.erlang_load / self.mean_holding_time
+
+    def region_rates(self, index):
+        """Arrival rate (flows per second) of every region at snapshot index."""
+        epoch = self.time_grid.epochs[index] / 1e9
+        utc_hour = (epoch % 86400) / 3600
+        local_hour = utc_hour + self.region_hours
+        modulation = 1 + self.diurnal_amplitude * np.cos(2 * np.pi * (local_hour - self.peak_hour) / 24)
+        return self.arrival_rate * self.region_weights / self.region_weights.sum() * modulation
+
+    def holding_times(self, n):
+        """n holding times in seconds."""
+        if self.holding_time_dist == 'exponential':
+            return self.rng.exponential(self.mean_holding_time, n)
+        # Lomax (numpy's pareto) plus one is Pareto with scale 1, rescaled to the requested mean
+        scale = self.mean_holding_time * (self.pareto_shape - 1) / self.pareto_shape
+        return (self.rng.pareto(self.pareto_shape, n) + 1) * scale
+
+    def sample_snapshot(self, index):
+        """Draw the flows arriving in the interval of snapshot index.
+
+        Returns:
+            start_lons, start_lats, end_lons, end_lats: endpoint coordinates of every arrival
+            durations: number of snapshots every flow lasts, at least one
+        """
+        counts = self.rng.poisson(self.region_rates(index) * self.interval)
+
+        # start cities, drawn from each region's own weights
+        start = np.empty(counts.sum(), dtype=np.int64)
+        position = 0
+        for region in np.flatnonzero(counts).tolist():
+            n, cdf = counts[region], self.region_cdfs[region]
+            rows = np.minimum(np.searchsorted(cdf, self.rng.random(n) * cdf[-1], side='right'), len(cdf) - 1)
+            start[position:position + n] = self.city_order[self.region_bounds[region] + rows]
+            position += n
+
+        end = self.demand_model.sample_ends(start, self.min_distance)
+        arrival_offsets = self.rng.random(len(start)) * self.interval
+        durations = np.maximum(np.ceil((arrival_offsets + self.holding_times(len(start))) / self.interval), 1)
+
+        demand = self.demand_model
+        return (demand.longitudes[start], demand.latitudes[start],
+                demand.longitudes[end], demand.latitudes[end], durations.astype(np.int64))
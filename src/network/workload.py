@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 22:30
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : workload.py
+
+import json
+import numpy as np
+
+from src.utils import Logger
+
+logger = Logger().get_logger()
+
+
+class Workload:
+    """Columnar flow list that can be saved once and replayed by any number of experiments.
+
+    Every flow field is one array: graph_index, duration and bandwidth as numbers, start and
+    target nodes as int32 codes into a shared node name table. Iterating or indexing yields
+    the same flow dicts FlowGenerator produces, so a Workload can be handed to FlowController
+    in place of the generated list.
+    """
+
+    def __init__(self, node_names, graph_index, start_node, target_node, duration, bandwidth, meta=None):
+        self.node_names = list(node_names)
+        self.graph_index = np.asarray(graph_index, dtype=np.int32)
+        self.start_node = np.asarray(start_node, dtype=np.int32)
+        self.target_node = np.asarray(target_node, dtype=np.int32)
+        self.duration = np.asarray(duration, dtype=np.int32)
+        self.bandwidth = np.asarray(bandwidth, dtype=float)  # NaN where the flow sets none
+        self.meta = meta or {}
+
+    @classmethod
+    def from_flows(cls, flows, **meta):
+        """Pack generated flow dicts, keeping extra keyword arguments (e.g. seed) as metadata."""
+        node_index = {}
+        columns = {'graph_index': [], 'start_node': [], 'target_node': [], 'duration': [], 'bandwidth': []}
+        for flow in flows:
+            columns['graph_index'].append(flow['graph_index'])
+            columns['start_node'].append(node_index.setdefault(flow['start_node'], len(node_index)))
+            columns['target_node'].append(node_index.setdefault(flow['target_node'], len(node_index)))
+            columns['duration'].append(flow['duration'])
+            columns['bandwidth'].append(flow.get('bandwidth', np.nan))
+        return cls(list(node_index), meta=meta, **columns)
+
+    def __len__(self):
+        return len(self.graph_index)
+
+    def __getitem__(self, idx):
+        flow = {
+            "graph_index": int(self.graph_index[idx]),
+            "primary_path": None,
+            "backup_path": None,
+            "start_node": self.node_names[self.start_node[idx]],
+            "target_node": self.node_names[self.target_node[idx]],
+            "duration": int(self.duration[idx]),
+        }
+        bandwidth = self.bandwidth[idx]
+        if bandwidth == bandwidth:
+            flow["bandwidth"] = float(bandwidth)
+        return flow
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def to_flows(self):
+        return list(self)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            node_names=np.array(self.node_names, dtype=str),
+            graph_index=self.graph_index,
+            start_node=self.start_node,
+            target_node=self.target_node,
+            duration=self.duration,
+            bandwidth=self.bandwidth,
+            meta=np.array(json.dumps(self.meta)),
+        )
+        logger.info(f"Saved workload of {len(self)} flows to {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        arrays['node_names'] = arrays['node_names'].tolist()
+        workload = cls(meta=meta, **arrays)
+        logger.info(f"Loaded workload of {len(workload)} flows from {path}")
+        return workload
@@ -51,11 +51,14 @@ class SatelliteVisualizer:
             satellite_data = json.load(f)
         satellite_coords = []
         for node in satellite_data['nodes']:
-            if 'latitude' in node and 'longitude' in node:
+            # snapshots store lat/lon, older ones latitude/longitude
+            lat = node.get('lat', node.get('latitude'))
+            lon = node.get('lon', node.get('longitude'))
+            if lat is not None and lon is not None:
                 satellite_coords.append({
                     'id': node['id'],
-                    'latitude': node['latitude'],
-                    'longitude': node['longitude']
+                    'latitude': lat,
+                    'longitude': lon
                 })
         return satellite_coords
 
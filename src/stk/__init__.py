@@ -1,3 +1,4 @@
-from .stk_manager import STKManager
+from .stk_manager import STKManager, extract_access_parallel
+from .access_cache import AccessCache
 
-__all__ = ['STKManager'] 
\ No newline at end of file
+__all__ = ['STKManager', 'AccessCache', 'extract_access_parallel']
\ No newline at end of file
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 15:02
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : access_cache.py
+
+import os
+import json
+import hashlib
+import numpy as np
+from pathlib import Path
+
+from src.utils import Logger
+
+logger = Logger().get_logger()
+
+
+class AccessCache:
+    """On-disk store of raw STK access results, one NPZ file per object pair.
+
+    The cache directory is keyed by a hash of the constellation parameters, the facility
+    positions, the access constraint, the scenario interval and the step, so changing any of
+    them starts a fresh cache while reruns with the same configuration skip every pair that
+    has already been fetched.
+    """
+
+    def __init__(self, cache_root, params):
+        self.params = params
+        key = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        self.cache_dir = Path(cache_root) / key
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        params_file = self.cache_dir / 'params.json'
+        if not params_file.exists():
+            with open(params_file, 'w') as f:
+                json.dump(params, f, indent=2)
+
+    def _pair_path(self, name_a, name_b):
+        return self.cache_dir / f"{name_a}__{name_b}.npz"
+
+    def has(self, name_a, name_b):
+        return self._pair_path(name_a, name_b).exists()
+
+    def load(self, name_a, name_b):
+        """Return the cached arrays of a pair as a dict, or None if it was never fetched."""
+        path = self._pair_path(name_a, name_b)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return {key: data[key] for key in data.files}
+        except (OSError, ValueError) as e:
+            # a worker died while writing, fetch the pair again
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, name_a, name_b, **arrays):
+        """Persist the arrays of a pair atomically so a crash never leaves a partial entry."""
+        path = self._pair_path(name_a, name_b)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **{key: np.asarray(value) for key, value in arrays.items()})
+        os.replace(tmp_path, path)
+
+    def cached_pairs(self):
+        return [tuple(path.stem.split('__', 1)) for path in self.cache_dir.glob('*__*.npz')]
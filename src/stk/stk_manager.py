@@ -9,9 +9,11 @@ import pandas as pd
 import networkx as nx
 from datetime import datetime
 from src.utils.sim_config import *
-from src.utils.tools import approx_time, get_time_list, generate_time_series
+from src.utils.tools import generate_time_series, set_node_coordinates, save_graph_list
+from src.utils.time_align import align_samples, forward_fill, parse_stk_times, snap_to_grid
 import re
 import json
+import multiprocessing
 import numpy as np
 from pathlib import Path
 
@@ -25,6 +27,7 @@ from agi.stk12.stkobjects import (
 from agi.stk12.stkdesktop import STKDesktop
 from agi.stk12.stkutil import AgEOrbitStateType
 from src.utils import Logger
+from src.stk.access_cache import AccessCache
 
 logger = Logger().get_logger()
 
@@ -36,7 +39,8 @@ class STKManager:
         self.stk_root = None
         self.scenario = None
         self.time_list = []
-        self.time_step = 300
+        self.time_step = time_step  # one step for the snapshot grid and every STK report
+        self.constraint_angle = 3.0  # deg, access constraint angle when constraint=True
         self.constellation = None
         self.satellites = []
         self.facilities = []
@@ -45,6 +49,12 @@ class STKManager:
         self.sat_fac_distances = []
         self.sat_name = ""
         self.fac_name = ""
+        self.sat_names = []
+        self.sat_lat = None  # (satellite x time) latitude, filled by get_sat_lla
+        self.sat_lon = None  # (satellite x time) longitude, filled by get_sat_lla
+        self.start_time = None
+        self.end_time = None
+        self.access_cache = None
         if platform.system() == "Linux":
             # Only STK Engine is available on Linux
             self.use_stk_engine = True
@@ -83,11 +93,12 @@ class STKManager:
         self.stk_root.LoadScenario(scenario_path)
         self.scenario = self.stk_root.CurrentScenario
         self.scenario.SetTimePeriod(start_time, end_time)
+        self.start_time, self.end_time = start_time, end_time
         if not self.use_stk_engine:
             # Graphics calls are not available when running STK Engine in NoGraphics mode
             self.stk_root.Rewind()
 
-    def create_scenario(self, start_time, end_time):
+    def create_scenario(self, start_time, end_time, save_time_series=True):
         # Close existing scenario if it exists
         if self.stk_root.CurrentScenario:
             self.stk_root.CloseScenario()
@@ -96,7 +107,8 @@ class STKManager:
         self.stk_root.NewScenario("new")
         self.scenario = self.stk_root.CurrentScenario
         self.scenario.SetTimePeriod(start_time, end_time)
-        self.time_series = generate_time_series(start_time, end_time, time_step)
+        self.start_time, self.end_time = start_time, end_time
+        self.time_series = generate_time_series(start_time, end_time, self.time_step, save=save_time_series)
         # Initialize empty graph list for each time step
         self.graph_list = []
         for i in range(len(self.time_series)):
@@ -166,30 +178,6 @@ class STKManager:
     def create_facilities(self):
         """Create multiple facilities within the scenario and return them, using 3D coordinates."""
 
-        # List of facility names and their geographical coordinates (latitude, longitude, altitude)
-        facility_data = [
-            ("Facility1", 34.0522, -118.2437, 85.0),  # 美国洛杉矶
-            ("Facility2", -33.8688, 151.2093, 85.0),  # 澳大利亚悉尼
-            ("Facility3", 51.5074, -0.1278, 85.0),  # 英国伦敦
-            ("Facility4", 48.8566, 2.3522, 85.0),  # 法国巴黎
-            ("Facility5", 40.7128, -74.0060, 85.0),  # 美国纽约
-            ("Facility6", 39.9042, 116.4074, 85.0),  # 中国北京
-            ("Facility7", -23.5505, -46.6333, 85.0),  # 巴西圣保罗
-            ("Facility8", 35.6895, 139.6917, 85.0),  # 日本东京
-            ("Facility9", 55.7558, 37.6173, 85.0),  # 俄罗斯莫斯科
-            ("Facility10", -34.6037, -58.3816, 85.0),  # 阿根廷布宜诺斯艾利斯
-            # ("Facility11", 40.7306, -73.9352, 85.0),  # 美国纽约（偏北）
-            # ("Facility12", 52.3676, 4.9041, 85.0),  # 荷兰阿姆斯特丹
-            # ("Facility13", 37.9838, 23.7275, 85.0),  # 希腊雅典
-            # ("Facility14", 19.4326, -99.1332, 85.0),  # 墨西哥墨西哥城
-            # ("Facility15", 43.6532, -79.3832, 85.0),  # 加拿大多伦多
-            # ("Facility16", 1.3521, 103.8198, 85.0),  # 新加坡
-            # ("Facility17", 55.6761, 12.5683, 85.0),  # 丹麦哥本哈根
-            # ("Facility18", 37.7749, -122.4194, 85.0),  # 美国旧金山
-            # ("Facility19", 40.7306, -73.9352, 85.0),  # 美国纽约（偏南）
-            # ("Facility20", 51.1657, 10.4515, 85.0),  # 德国
-        ]
-
         # Loop through each entry in the facility data
         for name, latitude, longitude, altitude in facility_data:
             # Create facility
@@ -206,9 +194,44 @@ class STKManager:
                 if not graph.has_node(name):
                     graph.add_node(name, lat=latitude, lon=longitude, alt=altitude)
 
-    def get_sat_access(self, constraint=False):
-        sce_time = []
+    def enable_access_cache(self, constraint=False, cache_root=None):
+        """Persist raw access results per object pair so interrupted runs can resume."""
+        params = {
+            'T': T, 'P': P, 'F': F, 'inc': inc, 'height': height,
+            'start_time': self.start_time, 'end_time': self.end_time,
+            'time_step': self.time_step, 'constraint': constraint,
+            'constraint_angle': self.constraint_angle if constraint else None,
+            'facilities': [list(facility) for facility in facility_data],
+        }
+        self.access_cache = AccessCache(cache_root or self.data_directory / 'access_cache', params)
+        logger.info(f"Access cache enabled at {self.access_cache.cache_dir}")
+
+    @staticmethod
+    def get_sat_pairs():
+        """All (satellite, neighbour) name pairs of the +Grid topology."""
+        sat_pairs = []
+        for plane_num in range(1, num_orbit_planes + 1):
+            for sat_num in range(1, num_sat_per_plane + 1):
+                cur_sat_name = f"Sat{plane_num}_{sat_num}"
+
+                # get satellite in adjacent orbit for current satellite
+                if plane_num < num_orbit_planes:
+                    inter_sat_name = f"Sat{plane_num + 1}_{sat_num}"
+                else:
+                    inter_sat_name = f"Sat1_{int((sat_num + F) % (T / P)) or int(T / P)}"
+
+                # get satellite in same orbit for current satellite
+                if sat_num == num_sat_per_plane:
+                    intra_sat_name = f"Sat{plane_num}_1"
+                else:
+                    intra_sat_name = f"Sat{plane_num}_{sat_num + 1}"
+
+                sat_pairs.append((cur_sat_name, inter_sat_name))
+                sat_pairs.append((cur_sat_name, intra_sat_name))
+        return sat_pairs
 
+    def get_sat_access(self, constraint=False, worker_id=0, num_workers=1):
+        """Compute access for every +Grid pair, or for this worker's share of the pairs."""
         # get all satellites in the scenario and create a dictionary mapping satellite names to satellite objects
         all_satellites = self.scenario.Children.GetElements(AgESTKObjectType.eSatellite)
         satellite_dict = {sat.InstanceName: sat for sat in all_satellites}
@@ -218,37 +241,17 @@ class STKManager:
                 # add constrains for Satellite object
                 accessConstraints = sat.AccessConstraints
                 cnstrAngle = accessConstraints.AddConstraint(29)
-                cnstrAngle.Angle = 3.0
+                cnstrAngle.Angle = self.constraint_angle
 
         try:
-            for plane_num in range(1, num_orbit_planes + 1):
-                for sat_num in range(1, num_sat_per_plane + 1):
-                    cur_sat_name = f"Sat{plane_num}_{sat_num}"
-                    cur_sat = satellite_dict.get(cur_sat_name)
-                    if not cur_sat:
-                        break
-
-                    # get satellite in adjacent orbit for current satellite
-                    if plane_num < num_orbit_planes:
-                        inter_sat_name = f"Sat{plane_num + 1}_{sat_num}"
-                    else:
-                        # print(f"this is {cur_sat_name} trying to connect Sat1_{int((sat_num + F) % (T / P)) or int(T / P)}")
-                        inter_sat_name = f"Sat1_{int((sat_num + F) % (T / P)) or int(T / P)}"
-                    inter_sat = satellite_dict.get(inter_sat_name)
-
-                    # get satellite in same orbit for current satellite
-                    if sat_num == num_sat_per_plane:
-                        intra_sat_name = f"Sat{plane_num}_1"
-                    else:
-                        intra_sat_name = f"Sat{plane_num}_{sat_num + 1}"
-                    intra_sat = satellite_dict.get(intra_sat_name)
-
-                    # compute access between satellites
-                    if inter_sat:
-                        self.compute_sat_access(cur_sat, inter_sat, constraint)
-
-                    if intra_sat:
-                        self.compute_sat_access(cur_sat, intra_sat, constraint)
+            sat_pairs = self.get_sat_pairs()[worker_id::num_workers]
+            for cur_sat_name, other_sat_name in sat_pairs:
+                cur_sat = satellite_dict.get(cur_sat_name)
+                other_sat = satellite_dict.get(other_sat_name)
+
+                # compute access between satellites
+                if cur_sat and other_sat:
+                    self.compute_sat_access(cur_sat, other_sat, constraint)
 
         except Exception as e:
             logger.error(f"Error in get_access: {e}")
@@ -256,168 +259,204 @@ class STKManager:
 
 
     def get_sat_lla(self):
+        """Fetch Lat/Lon of every satellite once into (satellite x time) arrays and write all snapshots."""
         try:
-            for sat in self.satellites:
-                rpt_elms = ["Time", "Lat", "Lon"]
-                sat_lla = []
-                sat_name = sat.InstanceName
-                chainDataProvider = sat.DataProviders.GetDataPrvTimeVarFromPath("LLA State/TrueOfDateRotating")
-                chainResults = chainDataProvider.ExecElements(
+            rpt_elms = ["Time", "Lat", "Lon"]
+            self.sat_names = [sat.InstanceName for sat in self.satellites]
+            self.sat_lat = np.full((len(self.satellites), len(self.time_series)), np.nan)
+            self.sat_lon = np.full((len(self.satellites), len(self.time_series)), np.nan)
+
+            for sat_idx, sat in enumerate(self.satellites):
+                lla_data_provider = sat.DataProviders.GetDataPrvTimeVarFromPath("LLA State/TrueOfDateRotating")
+                lla_results = lla_data_provider.ExecElements(
                     self.scenario.StartTime,
                     self.scenario.StopTime,
-                    self.time_step,  # Ensure time_step is defined or passed to the function
+                    self.time_step,
                     rpt_elms
                 )
+                data_sets = lla_results.DataSets
+                sat_times = data_sets.GetDataSetByName("Time").GetValues()
+                lats = np.asarray(data_sets.GetDataSetByName("Lat").GetValues(), dtype=float)
+                lons = np.asarray(data_sets.GetDataSetByName("Lon").GetValues(), dtype=float)
+
+                time_indices, valid = snap_to_grid(parse_stk_times(sat_times), self.time_series)
+                self.sat_lat[sat_idx, time_indices[valid]] = lats[valid]
+                self.sat_lon[sat_idx, time_indices[valid]] = lons[valid]
 
-                for i in range(len(chainResults.DataSets.GetDataSetByName("Time").GetValues())):
-                    sat_time = chainResults.DataSets.GetDataSetByName("Time").GetValues()[i]
-                    lat = chainResults.DataSets.GetDataSetByName("Lat").GetValues()[i]
-                    lon = chainResults.DataSets.GetDataSetByName("Lon").GetValues()[i]
-                    sat_lla.append([sat_time, lat, lon])
-                    
-                    # 更新 NetworkX 图中节点的属性
-                    for node in self.graph_list[i].nodes():
-                        if node == sat.InstanceName:
-                            self.graph_list[i].nodes[node]['lat'] = lat
-                            self.graph_list[i].nodes[node]['lon'] = lon
+            # 更新 NetworkX 图中节点的属性
+            set_node_coordinates(self.graph_list, self.sat_names, self.sat_lat, self.sat_lon)
         except Exception as e:
             logger.error(f"Error in get_sat_lla: {e}")
             raise e
 
     # @timeit_decorator
     def compute_sat_access(self, sat1, sat2, constraint=False):
-        access = sat1.GetAccessToObject(sat2)
-        access.ComputeAccess()
-        rpt_elms = ["Time", "Range"]
-        access_DP = access.DataProviders.GetDataPrvTimeVarFromPath("AER Data/Default")
-        access_result = access_DP.ExecElements(self.scenario.StartTime, self.scenario.StopTime, time_step, rpt_elms)
-        time_origin = []
-        sat_range = []
-        for intervalNum in range(access_result.Intervals.Count):
-            interval = access_result.Intervals[intervalNum]
-            time_origin.extend(interval.DataSets.GetDataSetByName('Time').GetValues())
-            sat_range.extend(interval.DataSets.GetDataSetByName('Range').GetValues())
+        sat1_name = sat1.InstanceName
+        sat2_name = sat2.InstanceName
+
+        cached = self.access_cache.load(sat1_name, sat2_name) if self.access_cache else None
+        if cached is not None:
+            time_origin, sat_range = cached['time'], cached['range']
+        else:
+            access = sat1.GetAccessToObject(sat2)
+            access.ComputeAccess()
+            rpt_elms = ["Time", "Range"]
+            access_DP = access.DataProviders.GetDataPrvTimeVarFromPath("AER Data/Default")
+            access_result = access_DP.ExecElements(self.scenario.StartTime, self.scenario.StopTime, self.time_step, rpt_elms)
+            time_origin = []
+            sat_range = []
+            for intervalNum in range(access_result.Intervals.Count):
+                interval = access_result.Intervals[intervalNum]
+                time_origin.extend(interval.DataSets.GetDataSetByName('Time').GetValues())
+                sat_range.extend(interval.DataSets.GetDataSetByName('Range').GetValues())
+
+            if self.access_cache:
+                self.access_cache.save(sat1_name, sat2_name,
+                                       time=np.array(time_origin, dtype=str),
+                                       range=np.array(sat_range, dtype=float))
 
         try:
-            # Approximate time_origin using approx_time function
-            matched_times = approx_time(time_origin, self.time_series)
-            
-            # Convert matched times to indices in time_series
-            time_indices = [self.time_series.get_loc(t) for t in matched_times]
-            
-            # Check for missing indices
-            all_indices = set(range(len(self.time_series)))
-            missing_indices = sorted(all_indices - set(time_indices))
-            
-            # Add range data as edge attribute to corresponding graphs
-            last_valid_range = None  # Track the last valid range value
-            
-            for time_idx in range(len(self.time_series)):
-                if time_idx in time_indices:
-                    # Get the corresponding range value
-                    range_idx = time_indices.index(time_idx)
-                    distance = sat_range[range_idx]
-                    last_valid_range = distance  # Update last valid range
-                    sun_outage = False
-                else:
-                    # Use last valid range or default 500 for missing indices
-                    distance = last_valid_range or 500
-                    sun_outage = True  # Mark as sun outage
-                    logger.debug(f"Missing index: {time_idx}, sun_outage: {sun_outage}")
-                
-                # Get corresponding graph from graph_list
-                graph = self.graph_list[time_idx]
-                
+            # Snap the samples onto the snapshot grid in one pass
+            slot_range, missing = align_samples(time_origin, sat_range, self.time_series)
+
+            # Use last valid range or default 500 for missing indices, marked as sun outage
+            distances = forward_fill(slot_range, missing, 500)
+
+            for graph, distance, sun_outage in zip(self.graph_list, distances.tolist(), missing.tolist()):
                 # Add edge with range and sun_outage attributes
-                sat1_name = sat1.InstanceName
-                sat2_name = sat2.InstanceName
                 graph.add_edge(sat1_name, sat2_name, range=distance, sun_outage=sun_outage)
-                
+
             # Log missing indices if any
-            if missing_indices:
-                logger.debug(f"Missing indices: {missing_indices}")
-                logger.debug("Time comparison:")
-                for orig, matched in zip(time_origin, matched_times):
-                    logger.debug(f"  Origin: {orig:<25} Matched: {matched}")
-                    
-        except KeyError as e:
-            logger.error(f"Failed to find time index in time_series: {e}")
-            raise
+            if missing.any():
+                logger.debug(f"Missing indices: {np.flatnonzero(missing).tolist()}")
+
         except Exception as e:
             logger.error(f"Unexpected error while processing range data: {e}")
             raise
-        
+
     def save_graph_data(self):
         # 确保graphs目录存在
         graphs_dir = self.project_root / 'graphs'
         graphs_dir.mkdir(parents=True, exist_ok=True)
-        
-        for idx, graph in enumerate(self.graph_list):
-            graph_path = graphs_dir / f'graph{idx}.json'
-            with open(graph_path, 'w') as f:
-                data = nx.node_link_data(graph, edges="edges")
-                # indent=2 for more compact but still readable JSON formatting
-                json.dump(data, f, indent=2)
-            logger.info(f"Saved graph data to {graph_path}")
+
+        # in snapshot_format, indent=2 for more compact but still readable JSON formatting
+        save_graph_list(self.graph_list, graphs_dir, indent=2)
+        logger.info(f"Saved graph data to {graphs_dir}")
 
     # calculate distance between sat and fac
-    def get_fac_access(self):
-        try: 
-            for facility in self.facilities:              
-                # Create chain object for satellite to facility
-                sat_fac_chain = self.scenario.Children.New(AgESTKObjectType.eChain, f"Chain_{facility.InstanceName}")
-                
-                # Add satellite constellation and facility
-                sat_fac_chain.Objects.AddObject(self.constellation)
-                sat_fac_chain.Objects.AddObject(facility)
-                sat_fac_chain.ComputeAccess()
-                
-                # Get data provider for range data as TimeVar
-                rpt_elms = ["Time", "Strand Name", "Range"]
-                chainDataProvider = sat_fac_chain.DataProviders.GetDataPrvTimeVarFromPath("Range Data")
-                chainResults = chainDataProvider.ExecElements(
-                    self.scenario.StartTime,
-                    self.scenario.StopTime,
-                    self.time_step,
-                    rpt_elms
-                )
-                
-                # Loop through all satellite access intervals
-                for intervalNum in range(chainResults.Intervals.Count):
-                    interval = chainResults.Intervals[intervalNum]
-                    
-                    # Get data for interval
-                    chain_times = interval.DataSets.GetDataSetByName("Time").GetValues()
-                    strand_names = interval.DataSets.GetDataSetByName("Strand Name").GetValues()
-                    sat_fac_distances = interval.DataSets.GetDataSetByName("Range").GetValues()
-                    
-                    # Process time data
-                    self.time_list = get_time_list()
-                    chain_time_list = approx_time(chain_times, self.time_list)
-                    time_indices = [self.time_series.get_loc(t) for t in chain_time_list]
-                    
-                    # Extract satellite name
-                    # Extract satellite name from strand name using regex
-                    match = re.search(r"\/(\w+)\s+To\s+.*\/(\w+)", strand_names[0])
-                    if match:
-                        sat_name = match.group(1)
-                    else:
-                        logger.error(f"Could not extract satellite name from strand: {strand_names[0]}")
-                        raise ValueError("Invalid strand name format")
-                    facility_name = facility.InstanceName
-                    
-                    # Add range data as edge attribute to corresponding graphs
-                    for time_idx, distance in zip(time_indices, sat_fac_distances):
-                        # Get corresponding graph from graph_list
-                        graph = self.graph_list[time_idx]        
-                        # Add edge with range attribute if it doesn't exist, update range if it does
-                        graph.add_edge(sat_name, facility_name, range=distance)
-                        # logger.debug(f"Added/updated range {distance} between {sat_name} and {facility_name} at time index {time_idx}")                       
-        
+    def get_fac_access(self, worker_id=0, num_workers=1):
+        try:
+            for facility in self.facilities[worker_id::num_workers]:
+                facility_name = facility.InstanceName
+                chain_name = f"Chain_{facility_name}"
+
+                cached = self.access_cache.load(chain_name, facility_name) if self.access_cache else None
+                if cached is not None:
+                    chain_times, sat_names, sat_fac_distances = cached['time'], cached['sat'], cached['range']
+                else:
+                    chain_times, sat_names, sat_fac_distances = self.compute_fac_access(facility, chain_name)
+                    if self.access_cache:
+                        self.access_cache.save(chain_name, facility_name,
+                                               time=np.array(chain_times, dtype=str),
+                                               sat=np.array(sat_names, dtype=str),
+                                               range=np.array(sat_fac_distances, dtype=float))
+
+                # Snap the samples onto the snapshot grid
+                time_indices, valid = snap_to_grid(parse_stk_times(chain_times), self.time_series)
+
+                # Add range data as edge attribute to corresponding graphs
+                for time_idx, sat_name, distance in zip(time_indices[valid].tolist(),
+                                                        np.asarray(sat_names)[valid].tolist(),
+                                                        np.asarray(sat_fac_distances)[valid].tolist()):
+                    # Add edge with range attribute if it doesn't exist, update range if it does
+                    self.graph_list[time_idx].add_edge(sat_name, facility_name, range=distance)
+
         except Exception as e:
             logger.error(f"Error in get_fac_access: {e}")
             raise e
 
+    def compute_fac_access(self, facility, chain_name):
+        """Raw chain samples between the constellation and a facility: times, satellite names, ranges."""
+        # Create chain object for satellite to facility
+        sat_fac_chain = self.scenario.Children.New(AgESTKObjectType.eChain, chain_name)
+
+        # Add satellite constellation and facility
+        sat_fac_chain.Objects.AddObject(self.constellation)
+        sat_fac_chain.Objects.AddObject(facility)
+        sat_fac_chain.ComputeAccess()
+
+        # Get data provider for range data as TimeVar
+        rpt_elms = ["Time", "Strand Name", "Range"]
+        chainDataProvider = sat_fac_chain.DataProviders.GetDataPrvTimeVarFromPath("Range Data")
+        chainResults = chainDataProvider.ExecElements(
+            self.scenario.StartTime,
+            self.scenario.StopTime,
+            self.time_step,
+            rpt_elms
+        )
+
+        chain_times = []
+        sat_names = []
+        sat_fac_distances = []
+        # Loop through all satellite access intervals
+        for intervalNum in range(chainResults.Intervals.Count):
+            interval = chainResults.Intervals[intervalNum]
+
+            # Get data for interval
+            interval_times = interval.DataSets.GetDataSetByName("Time").GetValues()
+            strand_names = interval.DataSets.GetDataSetByName("Strand Name").GetValues()
+
+            # Extract satellite name from strand name using regex
+            match = re.search(r"\/(\w+)\s+To\s+.*\/(\w+)", strand_names[0])
+            if not match:
+                logger.error(f"Could not extract satellite name from strand: {strand_names[0]}")
+                raise ValueError("Invalid strand name format")
+
+            chain_times.extend(interval_times)
+            sat_names.extend([match.group(1)] * len(interval_times))
+            sat_fac_distances.extend(interval.DataSets.GetDataSetByName("Range").GetValues())
+
+        return chain_times, sat_names, sat_fac_distances
+
+
+def run_access_worker(worker_id, num_workers, start_time, end_time, constraint=False):
+    """Fill the access cache with one worker's share of the pairs in its own STK Engine.
+
+    Only STK Engine allows several instances, so this is meant for Linux or for Windows with
+    use_stk_engine switched on.
+    """
+    manager = STKManager()
+    manager.use_stk_engine = True
+    manager.launch_stk()
+    # the parent process wrote time_series.json, workers must not race on it
+    manager.create_scenario(start_time, end_time, save_time_series=False)
+    manager.create_constellation("DeltaConstellation")
+    manager.create_facilities()
+    manager.enable_access_cache(constraint)
+    manager.get_sat_access(constraint, worker_id, num_workers)
+    manager.get_fac_access(worker_id, num_workers)
+    logger.info(f"Access worker {worker_id}/{num_workers} finished")
+
+
+def extract_access_parallel(num_workers, start_time, end_time, constraint=False):
+    """Split access extraction over several STK Engine processes.
+
+    Afterwards a manager with enable_access_cache(constraint) builds the graphs from the cache
+    without recomputing any pair.
+    """
+    generate_time_series(start_time, end_time, time_step)
+    ctx = multiprocessing.get_context('spawn')
+    workers = [
+        ctx.Process(target=run_access_worker, args=(worker_id, num_workers, start_time, end_time, constraint))
+        for worker_id in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        if worker.exitcode != 0:
+            logger.warning(f"Access worker {worker.name} exited with code {worker.exitcode}, rerun to resume")
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -8,4 +8,8 @@
 from .tools import *
 from .sim_config import *
 from .counter import Counter
-from .logger import Logger
\ No newline at end of file
+from .logger import Logger
+from .snapshot_store import SnapshotStore
+from .temporal_graph import TemporalGraph
+from .snapshot_sequence import SnapshotSequence
+from .time_grid import TimeGrid
\ No newline at end of file
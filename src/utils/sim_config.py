@@ -24,11 +24,74 @@ height = 6928
 num_orbit_planes = int(P)
 num_sat_per_plane = int(T / P)
 
+# ground facilities: (name, latitude, longitude, altitude)
+facility_data = [
+    ("Facility1", 34.0522, -118.2437, 85.0),  # 美国洛杉矶
+    ("Facility2", -33.8688, 151.2093, 85.0),  # 澳大利亚悉尼
+    ("Facility3", 51.5074, -0.1278, 85.0),  # 英国伦敦
+    ("Facility4", 48.8566, 2.3522, 85.0),  # 法国巴黎
+    ("Facility5", 40.7128, -74.0060, 85.0),  # 美国纽约
+    ("Facility6", 39.9042, 116.4074, 85.0),  # 中国北京
+    ("Facility7", -23.5505, -46.6333, 85.0),  # 巴西圣保罗
+    ("Facility8", 35.6895, 139.6917, 85.0),  # 日本东京
+    ("Facility9", 55.7558, 37.6173, 85.0),  # 俄罗斯莫斯科
+    ("Facility10", -34.6037, -58.3816, 85.0),  # 阿根廷布宜诺斯艾利斯
+    # ("Facility11", 40.7306, -73.9352, 85.0),  # 美国纽约（偏北）
+    # ("Facility12", 52.3676, 4.9041, 85.0),  # 荷兰阿姆斯特丹
+    # ("Facility13", 37.9838, 23.7275, 85.0),  # 希腊雅典
+    # ("Facility14", 19.4326, -99.1332, 85.0),  # 墨西哥墨西哥城
+    # ("Facility15", 43.6532, -79.3832, 85.0),  # 加拿大多伦多
+    # ("Facility16", 1.3521, 103.8198, 85.0),  # 新加坡
+    # ("Facility17", 55.6761, 12.5683, 85.0),  # 丹麦哥本哈根
+    # ("Facility18", 37.7749, -122.4194, 85.0),  # 美国旧金山
+    # ("Facility19", 40.7306, -73.9352, 85.0),  # 美国纽约（偏南）
+    # ("Facility20", 51.1657, 10.4515, 85.0),  # 德国
+]
+
+# topology simulator: 'stk' drives STKManager, 'analytic' runs the offline NumPy engine
+simulator = 'analytic'
+
+# minimum angle (deg) of an inter-satellite link above the earth limb when constraint=True
+isl_grazing_angle = 0.0
+
+# snapshot output: 'json' node-link files per snapshot or 'store' columnar SnapshotStore
+snapshot_format = 'json'
+
 # snapshot step
 time_step = 60   # 5min
 
 # flow configure
 avg_flow_num = 10
+# seed of the flow workload, None draws a different workload every run
+flow_seed = None
+
+# traffic mode: 'fixed' draws avg_flow_num flows of 3 snapshots each per snapshot,
+# 'poisson' draws Poisson arrivals at erlang_load with random holding times (TrafficModel)
+traffic_mode = 'fixed'
+erlang_load = 1000
+mean_holding_time = 180  # s
+holding_time_dist = 'exponential'  # 'exponential' or 'pareto'
+pareto_shape = 1.5
+diurnal_amplitude = 0.5  # relative rate swing over a day, 0 disables the diurnal modulation
+
+# routing backend of FlowController: 'nx' NetworkX or 'csr' compiled RoutingGraph.
+# Both find paths of the same cost but break ties differently, so 'csr' changes which
+# flows are blocked and stays opt-in
+routing_backend = 'nx'
+
+# 1+1 protection: 'sequential' routes the backup around the primary path,
+# 'disjoint' finds both as the cheapest disjoint pair (Suurballe)
+protection_mode = 'sequential'
+disjoint_type = 'link'  # 'link' or 'node'
+disjoint_weight = None  # None counts hops, 'range' uses the link range
+
+# reuse a flow's route in later snapshots and for later flows while it stays usable.
+# A reused route need not be the one a fresh search would pick, so this changes results
+route_cache = False
+
+# primary path of FlowController: 'k_shortest' searches every flow, 'gateway_tree' walks
+# one shortest-path tree per gateway and snapshot from the flow's satellite
+primary_routing = 'k_shortest'
 # avg_duration = 1200
 # minimum_bandwidth, maximum_bandwidth = 300, 500
 # avg_bandwidth = (minimum_bandwidth + maximum_bandwidth) / 2
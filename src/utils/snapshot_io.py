@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 19:00
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : snapshot_io.py
+
+import os
+import json
+import time
+import networkx as nx
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# below this many files the process pool start-up costs more than it saves
+MIN_PARALLEL_FILES = 8
+
+
+def get_graph_files(graphs_dir):
+    # Get all json files sorted by number
+    return sorted(Path(graphs_dir).glob('graph*.json'),
+                  key=lambda x: int(x.stem.replace('graph', '')))
+
+
+def load_graph_file(graph_file):
+    with open(graph_file, 'r') as f:
+        graph_data = json.load(f)
+    return nx.node_link_graph(graph_data, edges="edges")
+
+
+def save_graph_file(graph, graph_path, indent=2):
+    """Write one snapshot as node-link json and return the number of bytes written."""
+    data = json.dumps(nx.node_link_data(graph, edges="edges"), indent=indent)
+    with open(graph_path, 'w') as f:
+        f.write(data)
+    return len(data)
+
+
+def _num_workers(workers, num_files):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, num_files))
+
+
+def iter_load_snapshots(graph_files, workers=None, chunksize=2):
+    """Parse snapshot files in a process pool and yield the graphs in index order."""
+    graph_files = list(graph_files)
+    workers = _num_workers(workers, len(graph_files))
+    if workers == 1 or len(graph_files) < MIN_PARALLEL_FILES:
+        for graph_file in graph_files:
+            yield load_graph_file(graph_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map keeps submission order, so results stream back by index
+        yield from executor.map(load_graph_file, graph_files, chunksize=chunksize)
+
+
+def load_snapshots(graph_files, workers=None):
+    """Load all snapshot files concurrently and log the throughput."""
+    graph_files = list(graph_files)
+    start_time = time.perf_counter()
+    graph_list = list(iter_load_snapshots(graph_files, workers))
+    _log_throughput("Loaded", graph_files, time.perf_counter() - start_time)
+    return graph_list
+
+
+def save_snapshots(graph_list, graphs_dir, workers=None, indent=2):
+    """Serialize snapshots to graphs_dir/graph{idx}.json concurrently and log the throughput."""
+    graphs_dir = Path(graphs_dir)
+    graphs_dir.mkdir(parents=True, exist_ok=True)
+    graph_paths = [graphs_dir / f'graph{idx}.json' for idx in range(len(graph_list))]
+
+    start_time = time.perf_counter()
+    workers = _num_workers(workers, len(graph_list))
+    if workers == 1 or len(graph_list) < MIN_PARALLEL_FILES:
+        written = [save_graph_file(graph, path, indent) for graph, path in zip(graph_list, graph_paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = list(executor.map(save_graph_file, graph_list, graph_paths,
+                                        [indent] * len(graph_list), chunksize=2))
+    _log_throughput("Saved", graph_paths, time.perf_counter() - start_time, sum(written))
+    return graph_paths
+
+
+def _log_throughput(action, graph_files, elapsed, total_bytes=None):
+    if total_bytes is None:
+        total_bytes = sum(Path(graph_file).stat().st_size for graph_file in graph_files)
+    elapsed = max(elapsed, 1e-9)
+    logger.info(f"{action} {len(graph_files)} snapshots in {elapsed:.2f} s "
+                f"({len(graph_files) / elapsed:.1f} snapshots/s, {total_bytes / elapsed / 1e6:.1f} MB/s)")
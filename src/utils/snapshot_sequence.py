@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 18:10
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : snapshot_sequence.py
+
+import threading
+import weakref
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.logger import Logger
+from src.utils.snapshot_store import SnapshotStore, STORE_DIR_NAME, reads_store
+from src.utils.snapshot_io import get_graph_files, load_graph_file
+
+logger = Logger().get_logger()
+
+# rough in-memory footprint of a NetworkX node / edge with a few scalar attributes
+NODE_BYTES = 600
+EDGE_BYTES = 1000
+
+
+class SnapshotSequence:
+    """List-like view over snapshot graphs that loads them on first access.
+
+    Loaded snapshots are kept in an LRU cache bounded by memory_budget_mb, and the next
+    `prefetch` indices are loaded in the background since flows are processed in time order.
+
+    Snapshots modified after loading (e.g. allocated bandwidth) must be marked with
+    mark_dirty. When a dirty snapshot is evicted, the edge attributes registered with
+    track_edge_attribute are kept as one compact array per attribute and written back after
+    the load hooks when the snapshot is reloaded, so modified snapshots are evicted like clean
+    ones. Without tracked attributes dirty snapshots are pinned instead.
+    """
+
+    def __init__(self, loader, length, memory_budget_mb=1024, prefetch=2):
+        self.loader = loader
+        self.length = length
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.prefetch = prefetch
+        self.load_hooks = []
+        self.tracked_attributes = []
+        self._cache = OrderedDict()  # idx -> (graph, size)
+        self._cache_bytes = 0
+        self._pending = {}
+        self._dirty = set()  # indices of cached snapshots modified since they were loaded
+        self._saved = {}  # idx -> {attribute: values in graph.edges() order} of evicted dirty snapshots
+        self._index_of = weakref.WeakKeyDictionary()  # every loaded graph still referenced -> idx
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        self.loads = 0
+        self.evictions = 0
+        self.peak_bytes = 0
+
+    @classmethod
+    def from_graph_dir(cls, graphs_dir, **kwargs):
+        """Sequence over the store or the graph{idx}.json files of graphs_dir, see reads_store."""
+        graphs_dir = Path(graphs_dir)
+        if reads_store(graphs_dir):
+            store = SnapshotStore(graphs_dir / STORE_DIR_NAME)
+            return cls(store.get_graph, len(store), **kwargs)
+
+        graph_files = get_graph_files(graphs_dir)
+        return cls(lambda idx: load_graph_file(graph_files[idx]), len(graph_files), **kwargs)
+
+    def add_load_hook(self, hook):
+        """Call hook(graph) on every snapshot once it is loaded, including those already cached."""
+        with self._lock:
+            self.load_hooks.append(hook)
+            for graph, _ in self._cache.values():
+                hook(graph)
+
+    def track_edge_attribute(self, name):
+        """Keep edge attribute name of modified snapshots across eviction and reload."""
+        with self._lock:
+            if name not in self.tracked_attributes:
+                self.tracked_attributes.append(name)
+
+    def mark_dirty(self, graph):
+        """Mark a snapshot as modified since it was loaded.
+
+        A snapshot evicted while the caller still held it is put back, so the modified graph
+        replaces any clean copy loaded since.
+        """
+        with self._lock:
+            idx = self._index_of.get(graph)
+            if idx is None:
+                raise KeyError("graph was not loaded by this sequence")
+            self._dirty.add(idx)
+            if idx in self._cache and self._cache[idx][0] is graph:
+                return
+            if idx in self._cache:
+                self._cache_bytes -= self._cache.pop(idx)[1]
+            size = graph.number_of_nodes() * NODE_BYTES + graph.number_of_edges() * EDGE_BYTES
+            self._cache[idx] = (graph, size)
+            self._cache_bytes += size
+            self._evict()
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for idx in range(self.length):
+            yield self[idx]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.length))]
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError(f"snapshot index {idx} out of range")
+
+        graph = self._get(idx)
+        self._schedule_prefetch(idx)
+        return graph
+
+    def _get(self, idx):
+        with self._lock:
+            if idx in self._cache:
+                self._cache.move_to_end(idx)
+                return self._cache[idx][0]
+            future = self._pending.get(idx)
+
+        # wait for a background load of the same index instead of loading it twice
+        if future is not None:
+            future.result()
+            with self._lock:
+                if idx in self._cache:
+                    self._cache.move_to_end(idx)
+                    return self._cache[idx][0]
+        return self._load(idx)
+
+    def _load(self, idx):
+        graph = self.loader(idx)
+        size = graph.number_of_nodes() * NODE_BYTES + graph.number_of_edges() * EDGE_BYTES
+        with self._lock:
+            # another thread may have finished the same index meanwhile
+            if idx in self._cache:
+                return self._cache[idx][0]
+            for hook in self.load_hooks:
+                hook(graph)
+            self._restore(idx, graph)
+            self._cache[idx] = (graph, size)
+            self._cache_bytes += size
+            self._index_of[graph] = idx
+            self.loads += 1
+            self._evict()
+        return graph
+
+    def _evict(self):
+        # least recently used first, always keeping the most recent snapshot
+        newest = next(reversed(self._cache))
+        pinned = self._dirty if not self.tracked_attributes else ()
+        for idx in [i for i in self._cache if i not in pinned and i != newest]:
+            if self._cache_bytes <= self.memory_budget:
+                break
+            graph, size = self._cache.pop(idx)
+            self._cache_bytes -= size
+            if idx in self._dirty:
+                self._save(idx, graph)
+            self.evictions += 1
+            logger.debug(f"Evicted snapshot {idx} from cache")
+        if self._cache_bytes > self.memory_budget and pinned:
+            logger.warning(f"{len(pinned)} dirty snapshots keep the cache above its memory budget")
+        self.peak_bytes = max(self.peak_bytes, self._cache_bytes)
+
+    def _save(self, idx, graph):
+        # keep the tracked attributes of a modified snapshot before dropping it
+        self._dirty.discard(idx)
+        self._saved[idx] = {
+            name: np.array([data.get(name, np.nan) for _, _, data in graph.edges(data=True)], dtype=float)
+            for name in self.tracked_attributes
+        }
+
+    def _restore(self, idx, graph):
+        # write the tracked attributes saved at eviction back into the reloaded snapshot
+        saved = self._saved.get(idx)
+        if saved is None:
+            return
+        for name, values in saved.items():
+            if len(values) != graph.number_of_edges():
+                raise ValueError(f"snapshot {idx} reloaded with a different number of edges")
+            for (_, _, data), value in zip(graph.edges(data=True), values.tolist()):
+                if value == value:
+                    data[name] = value
+
+    def _schedule_prefetch(self, idx):
+        if not self._executor:
+            return
+        with self._lock:
+            for next_idx in range(idx + 1, min(idx + 1 + self.prefetch, self.length)):
+                if next_idx not in self._cache and next_idx not in self._pending:
+                    future = self._executor.submit(self._load, next_idx)
+                    self._pending[next_idx] = future
+                    future.add_done_callback(lambda _, i=next_idx: self._pending_done(i))
+
+    def _pending_done(self, idx):
+        with self._lock:
+            self._pending.pop(idx, None)
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 16:20
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : snapshot_store.py
+
+import os
+import json
+import shutil
+import numpy as np
+import networkx as nx
+from pathlib import Path
+
+from src.utils.logger import Logger
+from src.utils.sim_config import snapshot_format
+
+logger = Logger().get_logger()
+
+STORE_DIR_NAME = 'snapshots.store'
+
+
+def reads_store(graphs_dir):
+    """Whether the snapshots of graphs_dir are read from its store or from graph{idx}.json.
+
+    snapshot_format decides, the other format is only used when the configured one is missing.
+    """
+    graphs_dir = Path(graphs_dir)
+    has_store = SnapshotStore.exists(graphs_dir / STORE_DIR_NAME)
+    if snapshot_format == 'store':
+        return has_store or not any(graphs_dir.glob('graph*.json'))
+    return has_store and not any(graphs_dir.glob('graph*.json'))
+
+
+class SnapshotStore:
+    """Columnar binary store for a whole scenario of snapshot graphs.
+
+    Layout of the store directory (every array is a plain .npy file so it can be memory-mapped):
+        meta.json                 times, attribute kinds, number of snapshots
+        nodes.npy                 node names, shared by all snapshots
+        node_present.npy          (time x node) bool, node exists in the snapshot
+        node_<attr>.npy           (time x node) float, NaN where the attribute is missing
+        edge_offsets.npy          (time + 1) int64, edges of snapshot t are [offsets[t], offsets[t+1])
+        edge_u.npy / edge_v.npy   int32 node indices of all edges, concatenated over time
+        edge_<attr>.npy           float per edge, NaN where the attribute is missing
+
+    Only scalar (bool/int/float) node and edge attributes are stored.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / 'meta.json', 'r') as f:
+            self.meta = json.load(f)
+        self.times = self.meta['times']
+        self.node_names = np.load(self.store_dir / 'nodes.npy').tolist()
+        self.node_present = self._load('node_present')
+        self.node_attrs = {name: self._load(f'node_{name}') for name in self.meta['node_attrs']}
+        self.edge_offsets = self._load('edge_offsets')
+        self.edge_u = self._load('edge_u')
+        self.edge_v = self._load('edge_v')
+        self.edge_attrs = {name: self._load(f'edge_{name}') for name in self.meta['edge_attrs']}
+
+    def _load(self, name):
+        return np.load(self.store_dir / f'{name}.npy', mmap_mode='r')
+
+    @staticmethod
+    def exists(store_dir):
+        return (Path(store_dir) / 'meta.json').exists()
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.get_graph(i) for i in range(*idx.indices(len(self)))]
+        return self.get_graph(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.get_graph(idx)
+
+    def edge_slice(self, idx):
+        """Index range of the edges of snapshot idx in the concatenated edge arrays."""
+        return slice(int(self.edge_offsets[idx]), int(self.edge_offsets[idx + 1]))
+
+    def get_graph(self, idx):
+        """Materialize snapshot idx as a NetworkX graph."""
+        if idx < 0:
+            idx += len(self)
+        graph = nx.Graph()
+        graph.graph['time'] = self.times[idx]
+
+        node_idx = np.flatnonzero(self.node_present[idx])
+        node_columns = [(name, self.meta['node_attrs'][name], np.asarray(values[idx, node_idx]).tolist())
+                        for name, values in self.node_attrs.items()]
+        for row, n in enumerate(node_idx.tolist()):
+            attrs = {name: decode_value(column[row], kind) for name, kind, column in node_columns
+                     if column[row] == column[row]}
+            graph.add_node(self.node_names[n], **attrs)
+
+        edges = self.edge_slice(idx)
+        edge_columns = [(name, self.meta['edge_attrs'][name], np.asarray(values[edges]).tolist())
+                        for name, values in self.edge_attrs.items()]
+        us = np.asarray(self.edge_u[edges]).tolist()
+        vs = np.asarray(self.edge_v[edges]).tolist()
+        graph.add_edges_from(
+            (self.node_names[u], self.node_names[v],
+             {name: decode_value(column[row], kind) for name, kind, column in edge_columns
+              if column[row] == column[row]})
+            for row, (u, v) in enumerate(zip(us, vs))
+        )
+        return graph
+
+    def to_graph_list(self):
+        return [self.get_graph(idx) for idx in range(len(self))]
+
+    @staticmethod
+    def save(store_dir, graph_list):
+        """Write a list of snapshot graphs as a columnar store, replacing any existing one.
+
+        The arrays are written to a temporary sibling directory that is swapped in at the end,
+        so a failed save leaves the previous store untouched and no stale attribute files.
+        """
+        store_dir = Path(store_dir)
+        final_dir = store_dir
+        store_dir = final_dir.with_name(f"{final_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(store_dir, ignore_errors=True)
+        store_dir.mkdir(parents=True)
+
+        # node table shared by all snapshots, in first-seen order
+        node_index = {}
+        for graph in graph_list:
+            for node in graph.nodes():
+                node_index.setdefault(node, len(node_index))
+        node_names = list(node_index)
+        n_time, n_node = len(graph_list), len(node_names)
+
+        node_kinds = _attribute_kinds(data for graph in graph_list for _, data in graph.nodes(data=True))
+        edge_kinds = _attribute_kinds(data for graph in graph_list for _, _, data in graph.edges(data=True))
+
+        node_present = np.zeros((n_time, n_node), dtype=bool)
+        node_columns = {name: np.full((n_time, n_node), np.nan) for name in node_kinds}
+        edge_offsets = np.zeros(n_time + 1, dtype=np.int64)
+        edge_u, edge_v = [], []
+        edge_columns = {name: [] for name in edge_kinds}
+
+        for t, graph in enumerate(graph_list):
+            for node, data in graph.nodes(data=True):
+                n = node_index[node]
+                node_present[t, n] = True
+                for name in node_kinds:
+                    if name in data:
+                        node_columns[name][t, n] = data[name]
+            for u, v, data in graph.edges(data=True):
+                edge_u.append(node_index[u])
+                edge_v.append(node_index[v])
+                for name, column in edge_columns.items():
+                    column.append(data.get(name, np.nan))
+            edge_offsets[t + 1] = len(edge_u)
+
+        np.save(store_dir / 'nodes.npy', np.array(node_names, dtype=str))
+        np.save(store_dir / 'node_present.npy', node_present)
+        for name, values in node_columns.items():
+            np.save(store_dir / f'node_{name}.npy', values)
+        np.save(store_dir / 'edge_offsets.npy', edge_offsets)
+        np.save(store_dir / 'edge_u.npy', np.array(edge_u, dtype=np.int32))
+        np.save(store_dir / 'edge_v.npy', np.array(edge_v, dtype=np.int32))
+        for name, values in edge_columns.items():
+            np.save(store_dir / f'edge_{name}.npy', np.array(values, dtype=float))
+
+        meta = {
+            'times': [graph.graph.get('time') for graph in graph_list],
+            'node_attrs': node_kinds,
+            'edge_attrs': edge_kinds,
+        }
+        with open(store_dir / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        # swap the complete store in, the old one is only removed once the new one is in place
+        old_dir = final_dir.with_name(f"{final_dir.name}.{os.getpid()}.old")
+        if final_dir.exists():
+            os.replace(final_dir, old_dir)
+        os.replace(store_dir, final_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        logger.info(f"Saved {n_time} snapshots ({n_node} nodes, {len(edge_u)} edges) to {final_dir}")
+
+    @classmethod
+    def convert_graph_dir(cls, graphs_dir, store_dir=None):
+        """Convert a directory of graph{idx}.json node-link files into a store."""
+        from src.utils.snapshot_io import get_graph_files, load_snapshots
+
+        graphs_dir = Path(graphs_dir)
+        store_dir = Path(store_dir) if store_dir else graphs_dir / STORE_DIR_NAME
+        # always the JSON files, an existing store in graphs_dir is what gets replaced
+        cls.save(store_dir, load_snapshots(get_graph_files(graphs_dir)))
+        return cls(store_dir)
+
+
+def _attribute_kinds(attr_dicts):
+    """Map every scalar attribute name to 'bool', 'int' or 'float', skipping anything else."""
+    kinds = {}
+    skipped = set()
+    for data in attr_dicts:
+        for name, value in data.items():
+            if name in skipped:
+                continue
+            if isinstance(value, (bool, np.bool_)):
+                kind = 'bool'
+            elif isinstance(value, (int, np.integer)):
+                kind = 'int'
+            elif isinstance(value, (float, np.floating)):
+                kind = 'float'
+            else:
+                skipped.add(name)
+                kinds.pop(name, None)
+                continue
+            previous = kinds.get(name, kind)
+            # mixed int/float columns are stored as float
+            kinds[name] = kind if previous == kind else 'float'
+    if skipped:
+        logger.warning(f"Non-scalar attributes are not stored: {sorted(skipped)}")
+    return kinds
+
+
+def decode_value(value, kind):
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'int':
+        return int(value)
+    return value
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 17:05
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : temporal_graph.py
+
+import json
+import numpy as np
+import networkx as nx
+
+from src.utils.logger import Logger
+from src.utils.snapshot_store import SnapshotStore, decode_value
+
+logger = Logger().get_logger()
+
+
+class TemporalGraph:
+    """Delta-encoded sequence of snapshot topologies.
+
+    Every distinct undirected link gets an edge id. The topology at t=0 is stored once, each
+    later step only stores the edge ids added and removed relative to the previous step, and a
+    full keyframe every keyframe_interval steps bounds the replay cost of random access.
+    Edge attributes are stored per step, aligned with the sorted edge ids present at that step.
+    """
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.times = meta['times']
+        self.keyframe_interval = meta['keyframe_interval']
+        self.node_names = arrays['node_names'].tolist()
+        self.edge_u = arrays['edge_u']
+        self.edge_v = arrays['edge_v']
+        self.add_offsets = arrays['add_offsets']
+        self.add_ids = arrays['add_ids']
+        self.remove_offsets = arrays['remove_offsets']
+        self.remove_ids = arrays['remove_ids']
+        self.keyframe_offsets = arrays['keyframe_offsets']
+        self.keyframe_ids = arrays['keyframe_ids']
+        self.value_offsets = arrays['value_offsets']
+        self.edge_values = {name: arrays[f'edge_{name}'] for name in meta['edge_attrs']}
+        self.node_present = arrays['node_present']
+        self.node_values = {name: arrays[f'node_{name}'] for name in meta['node_attrs']}
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def num_edges(self):
+        """Number of distinct links over the whole scenario."""
+        return len(self.edge_u)
+
+    @classmethod
+    def from_store(cls, store, keyframe_interval=60):
+        """Build the delta encoding from a SnapshotStore."""
+        n_time = len(store)
+        n_node = len(store.node_names)
+
+        # undirected key of every stored edge, then one id per distinct key
+        u = np.asarray(store.edge_u, dtype=np.int64)
+        v = np.asarray(store.edge_v, dtype=np.int64)
+        keys = np.minimum(u, v) * n_node + np.maximum(u, v)
+        unique_keys, edge_of_row = np.unique(keys, return_inverse=True)
+
+        add_ids, remove_ids, keyframe_ids, order_rows = [], [], [], []
+        add_offsets = np.zeros(n_time + 1, dtype=np.int64)
+        remove_offsets = np.zeros(n_time + 1, dtype=np.int64)
+        keyframe_offsets = [0]
+        value_offsets = np.zeros(n_time + 1, dtype=np.int64)
+        previous = np.empty(0, dtype=np.int64)
+
+        for t in range(n_time):
+            rows = np.arange(store.edge_offsets[t], store.edge_offsets[t + 1])
+            ids = edge_of_row[rows]
+            order = np.argsort(ids, kind='stable')
+            current = ids[order]
+            order_rows.append(rows[order])
+            value_offsets[t + 1] = value_offsets[t] + len(current)
+
+            if t > 0:
+                add_ids.append(np.setdiff1d(current, previous, assume_unique=True))
+                remove_ids.append(np.setdiff1d(previous, current, assume_unique=True))
+            add_offsets[t + 1] = add_offsets[t] + (len(add_ids[-1]) if t > 0 else 0)
+            remove_offsets[t + 1] = remove_offsets[t] + (len(remove_ids[-1]) if t > 0 else 0)
+
+            if t % keyframe_interval == 0:
+                keyframe_ids.append(current)
+                keyframe_offsets.append(keyframe_offsets[-1] + len(current))
+            previous = current
+
+        order_rows = np.concatenate(order_rows) if order_rows else np.empty(0, dtype=np.int64)
+        arrays = {
+            'node_names': np.array(store.node_names, dtype=str),
+            'edge_u': (unique_keys // n_node).astype(np.int32),
+            'edge_v': (unique_keys % n_node).astype(np.int32),
+            'add_offsets': add_offsets,
+            'add_ids': _concat(add_ids),
+            'remove_offsets': remove_offsets,
+            'remove_ids': _concat(remove_ids),
+            'keyframe_offsets': np.array(keyframe_offsets, dtype=np.int64),
+            'keyframe_ids': _concat(keyframe_ids),
+            'value_offsets': value_offsets,
+            'node_present': np.asarray(store.node_present),
+        }
+        for name, values in store.edge_attrs.items():
+            arrays[f'edge_{name}'] = np.asarray(values)[order_rows]
+        for name, values in store.node_attrs.items():
+            arrays[f'node_{name}'] = np.asarray(values)
+
+        meta = {
+            'times': store.times,
+            'keyframe_interval': keyframe_interval,
+            'edge_attrs': store.meta['edge_attrs'],
+            'node_attrs': store.meta['node_attrs'],
+        }
+        temporal_graph = cls(arrays, meta)
+        logger.info(f"Delta-encoded {n_time} snapshots: {temporal_graph.num_edges} distinct links, "
+                    f"{len(arrays['add_ids']) + len(arrays['remove_ids'])} link events")
+        return temporal_graph
+
+    @classmethod
+    def from_graph_list(cls, graph_list, store_dir, keyframe_interval=60):
+        SnapshotStore.save(store_dir, graph_list)
+        return cls.from_store(SnapshotStore(store_dir), keyframe_interval)
+
+    def save(self, path):
+        arrays = {
+            'node_names': np.array(self.node_names, dtype=str),
+            'edge_u': self.edge_u, 'edge_v': self.edge_v,
+            'add_offsets': self.add_offsets, 'add_ids': self.add_ids,
+            'remove_offsets': self.remove_offsets, 'remove_ids': self.remove_ids,
+            'keyframe_offsets': self.keyframe_offsets, 'keyframe_ids': self.keyframe_ids,
+            'value_offsets': self.value_offsets, 'node_present': self.node_present,
+            'meta': np.array(json.dumps(self.meta)),
+        }
+        arrays.update({f'edge_{name}': values for name, values in self.edge_values.items()})
+        arrays.update({f'node_{name}': values for name, values in self.node_values.items()})
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        return cls(arrays, json.loads(str(arrays.pop('meta'))))
+
+    def changes(self, t):
+        """Edge ids (added, removed) at step t relative to step t - 1."""
+        added = self.add_ids[self.add_offsets[t]:self.add_offsets[t + 1]]
+        removed = self.remove_ids[self.remove_offsets[t]:self.remove_offsets[t + 1]]
+        return added, removed
+
+    def changed_links(self, t):
+        """Node-name pairs (added, removed) at step t relative to step t - 1."""
+        added, removed = self.changes(t)
+        return self.edge_names(added), self.edge_names(removed)
+
+    def edge_names(self, edge_ids):
+        return [(self.node_names[u], self.node_names[v])
+                for u, v in zip(self.edge_u[edge_ids].tolist(), self.edge_v[edge_ids].tolist())]
+
+    def edge_ids_at(self, t):
+        """Sorted edge ids present at step t, replayed from the nearest keyframe."""
+        k = t // self.keyframe_interval
+        present = np.zeros(self.num_edges, dtype=bool)
+        present[self.keyframe_ids[self.keyframe_offsets[k]:self.keyframe_offsets[k + 1]]] = True
+        for step in range(k * self.keyframe_interval + 1, t + 1):
+            added, removed = self.changes(step)
+            present[removed] = False
+            present[added] = True
+        return np.flatnonzero(present)
+
+    def edge_attribute(self, t, name):
+        """Values of an edge attribute at step t, aligned with edge_ids_at(t)."""
+        return self.edge_values[name][self.value_offsets[t]:self.value_offsets[t + 1]]
+
+    def graph_at(self, t):
+        """Materialize step t as a NetworkX graph."""
+        graph = nx.Graph()
+        graph.graph['time'] = self.times[t]
+
+        for n in np.flatnonzero(self.node_present[t]).tolist():
+            attrs = {}
+            for name, values in self.node_values.items():
+                value = float(values[t, n])
+                if value == value:
+                    attrs[name] = decode_value(value, self.meta['node_attrs'][name])
+            graph.add_node(self.node_names[n], **attrs)
+
+        edge_ids = self.edge_ids_at(t)
+        columns = [(name, self.meta['edge_attrs'][name], self.edge_attribute(t, name).tolist())
+                   for name in self.edge_values]
+        graph.add_edges_from(
+            (u, v, {name: decode_value(column[row], kind) for name, kind, column in columns
+                    if column[row] == column[row]})
+            for row, (u, v) in enumerate(self.edge_names(edge_ids))
+        )
+        return graph
+
+
+def _concat(arrays):
+    return np.concatenate(arrays).astype(np.int64) if arrays else np.empty(0, dtype=np.int64)
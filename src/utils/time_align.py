@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 14:10
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : time_align.py
+
+import numpy as np
+import pandas as pd
+
+# STK reports UTCG times like "1 Aug 2020 16:00:00.000"
+STK_TIME_FORMAT = '%d %b %Y %H:%M:%S'
+
+
+def to_epoch_ns(times):
+    """Convert timestamps (DatetimeIndex, list of Timestamps or ISO strings) to int64 ns."""
+    # a TimeGrid already holds its epochs
+    epochs = getattr(times, 'epochs', None)
+    if epochs is not None:
+        return epochs
+    return pd.DatetimeIndex(times).as_unit('ns').asi8
+
+
+def parse_stk_times(time_strings):
+    """Parse STK UTCG strings in bulk into int64 ns epochs, truncating fractional seconds."""
+    times = pd.Series(list(time_strings), dtype=str).str.split('.', n=1).str[0]
+    return to_epoch_ns(pd.to_datetime(times, format=STK_TIME_FORMAT))
+
+
+def snap_to_grid(epochs, grid):
+    """Snap each epoch to the latest grid time that is not after it.
+
+    Args:
+        epochs: int64 ns epochs
+        grid: sorted snapshot times (anything to_epoch_ns accepts)
+
+    Returns:
+        indices: grid index of every epoch (-1 if the epoch is before the grid)
+        valid: bool mask of epochs that found a grid slot
+    """
+    grid_ns = to_epoch_ns(grid)
+    indices = np.searchsorted(grid_ns, np.asarray(epochs, dtype=np.int64), side='right') - 1
+    return indices, indices >= 0
+
+
+def nearest_grid_indices(epochs, grid, tolerance=None):
+    """Index of the nearest grid time for each epoch, ties going to the earlier slot.
+
+    Args:
+        epochs: int64 ns epochs
+        grid: sorted snapshot times (anything to_epoch_ns accepts)
+        tolerance: maximum distance in seconds to accept a match, None accepts any
+
+    Returns:
+        indices: nearest grid index of every epoch
+        valid: bool mask of epochs within the tolerance
+    """
+    grid_ns = to_epoch_ns(grid)
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if len(grid_ns) == 1:
+        indices = np.zeros(len(epochs), dtype=np.int64)
+    else:
+        pos = np.clip(np.searchsorted(grid_ns, epochs), 1, len(grid_ns) - 1)
+        before = epochs - grid_ns[pos - 1] <= grid_ns[pos] - epochs
+        indices = np.where(before, pos - 1, pos)
+
+    if tolerance is None:
+        return indices, np.ones(len(epochs), dtype=bool)
+    return indices, np.abs(grid_ns[indices] - epochs) <= tolerance * 1e9
+
+
+def align_samples(time_strings, values, grid):
+    """Scatter STK samples onto the snapshot grid.
+
+    Returns:
+        slot_values: float array with one value per grid slot (NaN where missing)
+        missing: bool mask of grid slots that received no sample
+    """
+    slot_values = np.full(len(grid), np.nan)
+    if len(time_strings) == 0:
+        return slot_values, np.ones(len(grid), dtype=bool)
+
+    indices, valid = snap_to_grid(parse_stk_times(time_strings), grid)
+    # later samples win when several snap to the same slot
+    slot_values[indices[valid]] = np.asarray(values, dtype=float)[valid]
+    return slot_values, np.isnan(slot_values)
+
+
+def forward_fill(values, missing, default):
+    """Replace missing entries with the last valid value along axis 0, or default before any."""
+    steps = np.arange(values.shape[0]).reshape((-1,) + (1,) * (values.ndim - 1))
+    last_valid = np.maximum.accumulate(np.where(missing, -1, steps), axis=0)
+    filled = np.take_along_axis(values, np.maximum(last_valid, 0), axis=0)
+    return np.where(last_valid >= 0, filled, default)
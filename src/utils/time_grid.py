@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 20:40
+# @Author  : DanielFu
+# @Email   : daniel_fys@163.com
+# @File    : time_grid.py
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.utils.time_align import to_epoch_ns
+
+TIME_SERIES_FILE = Path(__file__).resolve().parents[2] / 'data' / 'time_series.json'
+
+# path -> (mtime_ns, TimeGrid), so every process parses time_series.json at most once per version
+_cache = {}
+
+
+class TimeGrid:
+    """Snapshot times held as a DatetimeIndex plus the matching int64 ns epochs.
+
+    Lookups are O(1) on a regular grid and fall back to a binary search otherwise.
+    """
+
+    def __init__(self, times):
+        self.index = pd.DatetimeIndex(times).as_unit('ns')
+        self.epochs = to_epoch_ns(self.index)
+        steps = np.diff(self.epochs)
+        # constant step in ns, or None for an irregular grid
+        self.step = int(steps[0]) if len(steps) and (steps == steps[0]).all() and steps[0] > 0 else None
+
+    @classmethod
+    def load(cls, path=TIME_SERIES_FILE):
+        """Shared grid of a time_series.json, re-parsed only when the file changes."""
+        path = Path(path)
+        mtime = path.stat().st_mtime_ns
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r') as f:
+                cached = (mtime, cls(json.load(f)))
+            _cache[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def invalidate(path=None):
+        """Drop the cached grid of path, or of every file if path is None."""
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(Path(path), None)
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def __getitem__(self, idx):
+        return self.index[idx]
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def to_list(self):
+        return list(self.index)
+
+    def _position(self, epochs, side='left'):
+        """Insertion position of int64 ns epochs into the grid."""
+        if self.step is not None:
+            offset = epochs - self.epochs[0]
+            pos = offset // self.step
+            # on a grid point 'left' stays there, anywhere else the position is the next slot
+            pos = pos + ((offset % self.step != 0) | (side == 'right'))
+            return np.clip(pos, 0, len(self.epochs))
+        return np.searchsorted(self.epochs, epochs, side=side)
+
+    def index_of(self, time):
+        """Index of the grid time closest to time, clamped to the grid, ties going to the earlier slot."""
+        epoch = int(to_epoch_ns([time])[0])
+        pos = int(self._position(epoch))
+        if pos == 0:
+            return 0
+        if pos == len(self.epochs):
+            return len(self.epochs) - 1
+        return pos - 1 if epoch - self.epochs[pos - 1] <= self.epochs[pos] - epoch else pos
+
+    def indices_within(self, start_time, duration):
+        """Indices of the grid times in [start_time, start_time + duration seconds]."""
+        start = int(to_epoch_ns([start_time])[0])
+        first = int(self._position(start))
+        last = int(self._position(start + int(duration * 1e9), side='right'))
+        return list(range(first, last))
@@ -5,24 +5,27 @@
 # @File    : utils.py
 
 import time
+import shutil
 import networkx as nx
 import json
 import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import timedelta, datetime
 from src.utils.logger import Logger
+from src.utils.time_align import parse_stk_times, snap_to_grid
+from src.utils.time_grid import TimeGrid
+from src.utils.snapshot_store import SnapshotStore, STORE_DIR_NAME, reads_store
+from src.utils.sim_config import snapshot_format
+from src.utils.snapshot_io import get_graph_files, load_graph_file, save_graph_file, load_snapshots, save_snapshots
 
 logger = Logger().get_logger()
 
 # find time indices in the time series that are within the duration time of the flow
 def find_time_indices(time_series, start_time, duration):
-    end_time = start_time + timedelta(seconds=duration)
-    indices = []
-    for i, t in enumerate(time_series):
-        if start_time <= t <= end_time:
-            indices.append(i)
-    return indices
+    grid = time_series if isinstance(time_series, TimeGrid) else TimeGrid(time_series)
+    return grid.indices_within(start_time, duration)
 
 
 # # decorator to measure the running time of a function
@@ -37,96 +40,92 @@ def find_time_indices(time_series, start_time, duration):
 #     return wrapper
 
 
-# # decorator to save the graph after modification
-# def save_graph_after_modification(func):
-#     def wrapper(self, graph, idx, *args, **kwargs):
-#         result = func(self, graph, idx, *args, **kwargs)
-#         current_file = Path(__file__).resolve()
-#         project_root = current_file.parents[2]
-#         graph_path = project_root / "graphs" / f"graph{idx}.json"
-#         if graph:
-#             # save graph as json
-#             data = nx.node_link_data(graph)  # or nx.adjacency_data(graph)
-#             with open(graph_path, 'w') as f:
-#                 logger.debug(f"trying to dump {data} to {graph_path}")
-#                 json.dump(data, f, indent=4)
-#             # nx.write_graphml(graph, graph_path)
-#             logger.info(f"Graph {idx} successfully saved after {func.__name__} modification. File path: {graph_path}")
-#         else:
-#             logger.warning(f"Warning: No graph was provided for saving at index {idx}.")
-#         return result
-#     return wrapper
+# decorator to save the graph after modification
+def save_graph_after_modification(func):
+    def wrapper(self, graph, idx, *args, **kwargs):
+        result = func(self, graph, idx, *args, **kwargs)
+        current_file = Path(__file__).resolve()
+        project_root = current_file.parents[2]
+        graph_path = project_root / "graphs" / f"graph{idx}.json"
+        if graph:
+            # save graph as json
+            save_graph_file(graph, graph_path, indent=4)
+            logger.info(f"Graph {idx} successfully saved after {func.__name__} modification. File path: {graph_path}")
+        else:
+            logger.warning(f"Warning: No graph was provided for saving at index {idx}.")
+        return result
+    return wrapper
 
 def approx_time(origin_times: list, reference_time_list: list):
     """Approximate times from origin_times to nearest times in reference_time_list."""
     try:
-        # Convert origin times to datetime objects, truncating seconds and microseconds
-        processed_times = []
-        for time_str in origin_times:
-            # Split at decimal point to remove microseconds
-            time_str = time_str.split('.')[0]
-            try:
-                dt = datetime.strptime(time_str, '%d %b %Y %H:%M:%S')
-                processed_times.append(dt)
-            except ValueError as e:
-                logger.error(f"Failed to parse time string: {time_str}")
-                raise e
-        
-        # Approximate each time to nearest reference time
-        approximated_times = set()  # Use set to avoid duplicates
-        
-        for orig_time in processed_times:
-            # Find the closest time that's less than or equal to orig_time
-            approx_time = None
-            for ref_time in reference_time_list:
-                if ref_time > orig_time:
-                    break
-                approx_time = ref_time
-            
-            # Only add if we found an approximation
-            if approx_time is not None:
-                approximated_times.add(approx_time)
-            else:
-                logger.warning(f"No approximation found for {orig_time}")
-    
-        result = sorted(list(approximated_times))
+        reference_times = pd.DatetimeIndex(reference_time_list)
+        indices, valid = snap_to_grid(parse_stk_times(origin_times), reference_times)
+        if not valid.all():
+            logger.warning(f"No approximation found for {np.asarray(origin_times)[~valid].tolist()}")
+
+        return list(reference_times[np.unique(indices[valid])])
 
-        return result
-        
     except Exception as e:
         logger.error(f"Error in approx_time: {e}")
         raise e
 
 def get_time_list():
-    project_root = Path(__file__).resolve().parents[2]
-    with open(project_root / 'data' / 'time_series.json', 'r') as f:
-        time_data = json.load(f)
-    time_series = [pd.to_datetime(t) for t in time_data]
-    return time_series
+    # the shared TimeGrid of time_series.json, parsed once per process (see TimeGrid.load).
+    # It indexes and iterates like the old list; pass it to find_time_indices as is.
+    return TimeGrid.load()
 
 def get_graph_list(graphs_dir):
-    graph_list = []
-    
-    # Get all json files sorted by number
-    graph_files = sorted(graphs_dir.glob('graph*.json'), 
-                        key=lambda x: int(x.stem.replace('graph','')))
-    
-    # Read each graph file and convert to networkx graph
-    for graph_file in graph_files:
-        with open(graph_file, 'r') as f:
-            graph_data = json.load(f)
-            graph = nx.node_link_graph(graph_data, edges="edges")
-            graph_list.append(graph)
-            
-    return graph_list
-
-def generate_time_series(start_time, end_time, time_step):
+    graphs_dir = Path(graphs_dir)
+    # the format snapshot_format selects, see reads_store
+    if reads_store(graphs_dir):
+        return SnapshotStore(graphs_dir / STORE_DIR_NAME).to_graph_list()
+
+    # Read the graph files concurrently and convert to networkx graphs
+    return load_snapshots(get_graph_files(graphs_dir))
+
+def save_graph_list(graph_list, graphs_dir, indent=2):
+    """Write snapshots to graphs_dir in the format snapshot_format selects."""
+    graphs_dir = Path(graphs_dir)
+    if snapshot_format == 'store':
+        SnapshotStore.save(graphs_dir / STORE_DIR_NAME, graph_list)
+        return
+
+    save_snapshots(graph_list, graphs_dir, indent=indent)
+    # a store left from an earlier run would no longer match the json files
+    if (graphs_dir / STORE_DIR_NAME).exists():
+        shutil.rmtree(graphs_dir / STORE_DIR_NAME)
+        logger.info(f"Removed stale snapshot store {graphs_dir / STORE_DIR_NAME}")
+
+def set_node_coordinates(graph_list, node_names, lats, lons):
+    """Write lat/lon node attributes into every snapshot from (node x time) arrays, skipping NaN."""
+    lats = np.asarray(lats)
+    lons = np.asarray(lons)
+    for idx, graph in enumerate(graph_list):
+        nx.set_node_attributes(graph, {
+            name: {'lat': lat, 'lon': lon}
+            for name, lat, lon in zip(node_names, lats[:, idx].tolist(), lons[:, idx].tolist())
+            if lat == lat and lon == lon
+        })
+
+def haversine_distance(lat1, lon1, lat2, lon2, radius=6371):
+    """Great-circle distance in km between points in degrees, element-wise over arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * radius * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def generate_time_series(start_time, end_time, time_step, save=True):
     project_root = Path(__file__).resolve().parents[2]
     # Convert time_step (in seconds) to pandas frequency string
     freq = f'{time_step}s'  # 's' represents seconds
     time_series = pd.date_range(start=start_time, end=end_time, freq=freq)
+    if not save:
+        # worker processes only need the grid, the parent writes time_series.json
+        return time_series
     # Convert timestamps to ISO format strings
     formatted_times = [ts.strftime('%Y-%m-%dT%H:%M:%S') for ts in time_series]
     with open(project_root / 'data' / 'time_series.json', 'w') as f:
         json.dump(formatted_times, f)
+    TimeGrid.invalidate(project_root / 'data' / 'time_series.json')
     return time_series